@@ -0,0 +1,107 @@
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+import orjson
+
+from core.config import settings
+from services.embedders import EMBEDDING_BACKENDS, load_embedder
+
+FIXTURE_CORPUS = os.path.join(os.path.dirname(__file__), "tests", "fixtures", "corpus.ndjson")
+
+
+def load_corpus(path: str) -> list[dict]:
+    """NDJSON as written by /documents/export, or one plain-text document per line."""
+    docs = []
+    with open(path, "rb") as f:
+        for number, line in enumerate(f):
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith(b"{"):
+                doc = orjson.loads(line)
+                docs.append({"id": doc["id"], "title": doc.get("title", ""), "content": doc.get("content", "")})
+            else:
+                text = line.decode()
+                docs.append({"id": str(number), "title": text[:80], "content": text})
+    return docs
+
+
+def encode(model, texts: list[str], batch_size: int) -> np.ndarray:
+    return model.encode(texts, batch_size=batch_size, normalize_embeddings=True, convert_to_numpy=True)
+
+
+def measure(model, docs: list[str], queries: list[str], batch_size: int) -> dict:
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        encode(model, [query], 1)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    started = time.perf_counter()
+    doc_vectors = encode(model, docs, batch_size)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "doc_vectors": doc_vectors,
+        "query_vectors": encode(model, queries, batch_size),
+        "p50_ms": statistics.median(latencies),
+        "p95_ms": statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0],
+        "docs_per_second": len(docs) / elapsed,
+    }
+
+
+def top_k(query_vectors: np.ndarray, doc_vectors: np.ndarray, k: int) -> np.ndarray:
+    return np.argsort(-(query_vectors @ doc_vectors.T), axis=1)[:, :k]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compare an embedding backend against the PyTorch reference on a corpus."
+    )
+    parser.add_argument(
+        "corpus", nargs="?", default=FIXTURE_CORPUS, help="NDJSON export or plain-text file"
+    )
+    parser.add_argument("--backend", choices=EMBEDDING_BACKENDS, default="onnx-int8")
+    parser.add_argument("--onnx-file-name", default=settings.embedding_onnx_file_name)
+    parser.add_argument("--model", default=settings.vector_model_name)
+    parser.add_argument("--queries", type=int, default=200, help="number of titles used as queries")
+    parser.add_argument("--batch-size", type=int, default=settings.embedding_batch_max_size)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--min-cosine", type=float, default=0.98, help="parity threshold per document")
+    parser.add_argument("--min-recall", type=float, default=0.9, help="parity threshold for recall@k")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus)
+    if not corpus:
+        sys.exit("empty corpus")
+    docs = [f"{doc['title']}\n{doc['content']}" for doc in corpus]
+    queries = [doc["title"] for doc in corpus[: args.queries]]
+
+    reference = measure(load_embedder(args.model, "torch"), docs, queries, args.batch_size)
+    candidate = measure(
+        load_embedder(args.model, args.backend, args.onnx_file_name), docs, queries, args.batch_size
+    )
+
+    cosines = np.sum(reference["doc_vectors"] * candidate["doc_vectors"], axis=1)
+    k = min(args.k, len(docs))
+    expected = top_k(reference["query_vectors"], reference["doc_vectors"], k)
+    actual = top_k(candidate["query_vectors"], candidate["doc_vectors"], k)
+    recall = float(np.mean([len(set(e) & set(a)) / k for e, a in zip(expected, actual)]))
+
+    print(f"corpus: {len(docs)} documents, {len(queries)} queries, model {args.model}")
+    print(f"{'backend':<12}{'p50 ms':>10}{'p95 ms':>10}{'docs/s':>12}")
+    for name, result in (("torch", reference), (args.backend, candidate)):
+        print(f"{name:<12}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['docs_per_second']:>12.1f}")
+    print(f"cosine to torch: mean {cosines.mean():.4f}, min {cosines.min():.4f}")
+    print(f"recall@{k} vs torch: {recall:.3f}")
+
+    if cosines.min() < args.min_cosine or recall < args.min_recall:
+        sys.exit("parity check failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,12 @@ class Settings(BaseSettings):
     immudb_port: int = 3322
     immudb_username: str = "immudb"
     immudb_password: str = "immudb"
+    immudb_pool_size: int = 8
+    immudb_connect_timeout_seconds: float = 5
+    immudb_call_timeout_seconds: float = 10
+    immudb_keepalive_seconds: float = 30
+    immudb_group_commit_window_ms: float = 2
+    immudb_group_commit_max_keys: int = 512
     secret_key: str
     access_token_expire_minutes: int = 30
 
@@ -21,6 +27,30 @@ class Settings(BaseSettings):
     elasticsearch_ca_certs: Optional[str] = None
 
     documents_index: str = "documents"
+    news_index: str = "news"
+    learn_index: str = "learn"
+    documents_index_version: int = 1
+    elasticsearch_refresh: str = "false"
+    elasticsearch_bulk_max_actions: int = 500
+    elasticsearch_bulk_max_bytes: int = 5 * 1024 * 1024
+    elasticsearch_bulk_flush_interval_ms: float = 50
+    elasticsearch_bulk_max_retries: int = 3
+
+    search_cache_max_entries: int = 1000
+    search_cache_ttl_seconds: float = 30
+    # with ELASTICSEARCH_REFRESH=false a write becomes searchable only after
+    # the next index refresh (1s by default); the cache is bumped again then
+    search_cache_refresh_lag_seconds: float = 2
+
+    document_cache_backend: str = "memory"
+    document_cache_max_entries: int = 10_000
+    document_cache_max_bytes: int = 64 * 1024 * 1024
+    document_cache_ttl_seconds: float = 300
+    redis_url: str = "redis://redis:6379/0"
+
+    record_codec: str = "orjson"
+    record_compression_threshold: int = 0
+    record_compression_level: int = 3
 
     vector_search_enabled: bool = True
     qdrant_host: str = "qdrant"
@@ -28,6 +58,20 @@ class Settings(BaseSettings):
     qdrant_api_key: Optional[str] = None
     qdrant_collection: str = "documents_vectors"
     vector_model_name: str = "all-MiniLM-L6-v2"
+    # torch | onnx | onnx-int8 (dynamically quantized ONNX, CPU only)
+    embedding_backend: str = "torch"
+    embedding_onnx_file_name: Optional[str] = None
+    # passages fill the model's max_seq_length; this many tokens overlap
+    vector_passage_overlap_tokens: int = 32
+    embedding_batch_max_size: int = 32
+    embedding_batch_max_wait_ms: float = 5
+    embedding_cache_max_entries: int = 10_000
+    embedding_cache_path: Optional[str] = None
+    embedding_cache_disk_max_entries: int = 1_000_000
+    # set to hand inference to a shared `python -m services.embeddingWorker`
+    embedding_worker_socket: Optional[str] = None
+    embedding_worker_threads: int = 0
+    embedding_worker_timeout_seconds: float = 30
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,171 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from db.immudb_client import immudb
+
+MARKER = b"1"
+SCAN_PAGE_SIZE = 500
+
+
+def encode_cursor(item_id: str) -> str:
+    return base64.urlsafe_b64encode(item_id.encode()).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[str]:
+    if not cursor:
+        return None
+    try:
+        return base64.urlsafe_b64decode(cursor.encode()).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+# Index keys live under their own namespace. Under the record prefix
+# (``user:index:<name>`` next to ``user:<name>``) a record whose id starts
+# with "index:" or "latest:" would collide with an index entry.
+INDEX_NAMESPACE = b"idx:"
+
+
+async def _move_entries(old_prefix: bytes, new_prefix: bytes, belongs) -> int:
+    """Move entries accepted by ``belongs(key, value)`` to ``new_prefix``.
+
+    Used once per index to leave the pre-namespace key layout; records that
+    merely share the old prefix are left where they are.
+    """
+    moved = 0
+    seek = b""
+    while True:
+        entries = await immudb.scan(seek, old_prefix, False, SCAN_PAGE_SIZE + 1)
+        entries.pop(seek, None)
+        if not entries:
+            return moved
+        kv = {
+            new_prefix + key[len(old_prefix):]: value
+            for key, value in entries.items()
+            if belongs(key, value)
+        }
+        if kv:
+            await immudb.set_all(kv)
+            await immudb.delete_all([old_prefix + key[len(new_prefix):] for key in kv])
+            moved += len(kv)
+        seek = max(entries)
+
+
+class KeyIndex:
+    """Collection index kept as one marker key per id.
+
+    Adding an id writes a single ``idx:<index>:<id>`` key, so it costs the
+    same no matter how big the collection is and concurrent creates never
+    overwrite each other. Listing is an immudb prefix scan over the markers.
+    """
+
+    def __init__(self, legacy_key: bytes):
+        # legacy_key is the old JSON list blob, only read by migrate()
+        self.legacy_key = legacy_key
+        self.old_prefix = legacy_key + b":"
+        self.prefix = INDEX_NAMESPACE + legacy_key + b":"
+
+    def marker(self, item_id: str) -> bytes:
+        return self.prefix + item_id.encode()
+
+    async def add(self, item_id: str):
+        await immudb.set(self.marker(item_id), MARKER)
+
+    async def remove(self, item_id: str):
+        await immudb.delete(self.marker(item_id))
+
+    async def page(self, after: Optional[str], limit: int) -> list[str]:
+        seek = self.marker(after) if after else b""
+        # ask for one extra entry in case the server treats the seek key as inclusive
+        entries = await immudb.scan(seek, self.prefix, False, limit + 1)
+        ids = [key[len(self.prefix):].decode() for key in entries]
+        return [item_id for item_id in ids if item_id != after][:limit]
+
+    async def cursor_page(self, cursor: Optional[str], limit: int) -> tuple[list[str], Optional[str]]:
+        ids = await self.page(decode_cursor(cursor), limit)
+        next_cursor = encode_cursor(ids[-1]) if len(ids) == limit else None
+        return ids, next_cursor
+
+    async def iter_ids(self) -> AsyncIterator[str]:
+        after = None
+        while True:
+            ids = await self.page(after, SCAN_PAGE_SIZE)
+            for item_id in ids:
+                yield item_id
+            if len(ids) < SCAN_PAGE_SIZE:
+                return
+            after = ids[-1]
+
+    async def all(self) -> list[str]:
+        return [item_id async for item_id in self.iter_ids()]
+
+    async def migrate(self) -> int:
+        """Convert the legacy JSON list blob into marker keys.
+
+        Markers written under the record prefix by older versions are moved
+        into the index namespace first. Safe to run repeatedly: once converted
+        the call becomes an empty scan and a missed get.
+        """
+        moved = await _move_entries(
+            self.old_prefix, self.prefix, lambda key, value: value == MARKER
+        )
+        if moved:
+            print(f"Moved {moved} markers from {self.old_prefix!r} to {self.prefix!r}")
+
+        entry = await immudb.get(self.legacy_key)
+        if not entry:
+            return moved
+        try:
+            ids = json.loads(entry.value.decode())
+        except ValueError:
+            print("Legacy index is not valid JSON, leaving it in place:", self.legacy_key)
+            return 0
+
+        unique_ids = list(dict.fromkeys(ids))
+        for start in range(0, len(unique_ids), SCAN_PAGE_SIZE):
+            chunk = unique_ids[start:start + SCAN_PAGE_SIZE]
+            await immudb.set_all({self.marker(item_id): MARKER for item_id in chunk})
+
+        await immudb.delete(self.legacy_key)
+        print(f"Migrated {len(unique_ids)} ids from {self.legacy_key!r}")
+        return len(unique_ids)
+
+
+class TimeIndex:
+    """Secondary index ordered by creation time.
+
+    Each live document has a ``<index>:<created_at>:<id>`` key whose value
+    is the id, so the newest N are one reverse prefix scan with limit N.
+    Soft-deleted documents have their key removed.
+    """
+
+    def __init__(self, key: bytes):
+        self.old_prefix = key + b":"
+        self.prefix = INDEX_NAMESPACE + key + b":"
+
+    async def migrate(self) -> int:
+        """Move entries written before the index namespace existed."""
+        return await _move_entries(
+            self.old_prefix,
+            self.prefix,
+            lambda key, value: key.endswith(b":" + value),
+        )
+
+    def entry_key(self, created_at: str, item_id: str) -> bytes:
+        # created_at comes from isoformat(), which drops the fraction when it is
+        # zero; pad it so keys sort chronologically
+        moment = datetime.fromisoformat(created_at.rstrip("Z"))
+        return self.prefix + moment.strftime("%Y-%m-%dT%H:%M:%S.%f").encode() + b":" + item_id.encode()
+
+    async def remove(self, created_at: str, item_id: str):
+        await immudb.delete(self.entry_key(created_at, item_id))
+
+    async def latest(self, limit: int) -> list[str]:
+        entries = await immudb.scan(b"", self.prefix, True, limit)
+        return [value.decode() for value in entries.values()]
+
+    async def is_empty(self) -> bool:
+        return not await immudb.scan(b"", self.prefix, False, 1)
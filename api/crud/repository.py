@@ -0,0 +1,186 @@
+from datetime import datetime
+from typing import Optional
+from schemas.documents import DocumentBase
+
+from db.immudb_client import immudb, group_commit
+from db.cache import document_cache
+from db.codec import codec
+from crud.index import KeyIndex, TimeIndex, MARKER, SCAN_PAGE_SIZE
+
+SUMMARY_EXCLUDE = {"content", "metadata"}
+
+
+class CollectionRepository:
+    """Document storage for one immudb key prefix.
+
+    Shared by the documents, news and learn collections. All writes go
+    through the group committer, so a document and its index marker land in
+    the same immudb transaction as other writes made at the same moment.
+    """
+
+    def __init__(self, prefix: bytes, index_key: bytes, timeline_key: bytes):
+        self.prefix = prefix
+        self.index = KeyIndex(index_key)
+        self.timeline = TimeIndex(timeline_key)
+
+    def key(self, doc_id: str) -> bytes:
+        return self.prefix + doc_id.encode()
+
+    async def migrate_index(self) -> int:
+        migrated = await self.index.migrate()
+        await self.timeline.migrate()
+        if await self.timeline.is_empty():
+            await self._backfill_timeline()
+        return migrated
+
+    async def _backfill_timeline(self):
+        ids = []
+        async for doc_id in self.index.iter_ids():
+            ids.append(doc_id)
+            if len(ids) == SCAN_PAGE_SIZE:
+                await self._write_timeline(ids)
+                ids = []
+        if ids:
+            await self._write_timeline(ids)
+
+    async def _write_timeline(self, ids: list[str]):
+        docs = await self.get_documents(ids)
+        kv = {
+            self.timeline.entry_key(doc["created_at"], doc["id"]): doc["id"].encode()
+            for doc in docs
+            if doc.get("created_at") and not doc.get("deleted")
+        }
+        if kv:
+            await immudb.set_all(kv)
+
+    async def _write(self, kv: dict[bytes, bytes]):
+        await group_commit.set_all(kv)
+        for key in kv:
+            await document_cache.invalidate(key)
+
+    async def create_document(self, data: dict, creator: str) -> dict:
+        now = datetime.utcnow().isoformat() + "Z"
+
+        doc = {
+            "id": data["id"],
+            "deleted": False,
+            "title": data["title"],
+            "content": data["content"],
+            "author": data.get("author"),
+            "tags": data.get("tags", []),
+            "metadata": data.get("metadata", {}),
+            "creator": creator,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+        await self._write({
+            self.key(doc["id"]): codec.encode(doc),
+            self.index.marker(doc["id"]): MARKER,
+            self.timeline.entry_key(now, doc["id"]): doc["id"].encode(),
+        })
+        return doc
+
+    async def delete_document(self, doc_id: str) -> Optional[dict]:
+        entry = await immudb.get(self.key(doc_id))
+        if not entry:
+            return None
+
+        data = codec.decode(entry.value)
+        data["deleted"] = not bool(data["deleted"])
+
+        kv = {self.key(data["id"]): codec.encode(data)}
+        if not data["deleted"]:
+            kv[self.timeline.entry_key(data["created_at"], data["id"])] = data["id"].encode()
+        await self._write(kv)
+        if data["deleted"]:
+            # the record is already flipped and the caller still has to drop
+            # it from search; a leftover timeline entry is filtered out by
+            # hydrated latest_documents, so it must not fail the delete
+            try:
+                await self.timeline.remove(data["created_at"], data["id"])
+            except Exception as e:
+                print("Failed to remove timeline entry for", data["id"], e)
+        return data
+
+    async def update_document(self, data: DocumentBase) -> Optional[dict]:
+        entry = await immudb.get(self.key(data.id))
+        if not entry:
+            return None
+
+        entry = codec.decode(entry.value)
+        now = datetime.utcnow().isoformat() + "Z"
+
+        new_doc = {
+            "id": entry["id"],
+            "deleted": False,
+            "title": data.title,
+            "content": data.content,
+            "author": data.author,
+            "tags": data.tags,
+            "metadata": data.metadata,
+            "creator": entry.get("creator"),
+            "created_at": entry.get("created_at"),
+            "updated_at": now,
+        }
+
+        kv = {self.key(entry["id"]): codec.encode(new_doc)}
+        if entry.get("deleted"):
+            # updating a soft-deleted document restores it
+            kv[self.timeline.entry_key(new_doc["created_at"], new_doc["id"])] = new_doc["id"].encode()
+        await self._write(kv)
+        return new_doc
+
+    async def get_document(self, doc_id: str) -> Optional[dict]:
+        key = self.key(doc_id)
+        value = await document_cache.get(key)
+        if value is None:
+            token = document_cache.token()
+            entry = await immudb.get(key)
+            if not entry:
+                return None
+            value = entry.value
+            await document_cache.set(key, value, token)
+        return codec.decode(value)
+
+    async def get_documents(self, doc_ids: list[str]) -> list[dict]:
+        """Fetch many documents with a single immudb getAll, keeping request order."""
+        keys = [self.key(doc_id) for doc_id in dict.fromkeys(doc_ids)]
+        if not keys:
+            return []
+
+        values = {}
+        for key in keys:
+            value = await document_cache.get(key)
+            if value is not None:
+                values[key] = value
+
+        missing = [key for key in keys if key not in values]
+        if missing:
+            token = document_cache.token()
+            entries = await immudb.get_all(missing)
+            for key, value in entries.items():
+                values[key] = value
+                await document_cache.set(key, value, token)
+
+        return [codec.decode(values[key]) for key in keys if values.get(key)]
+
+    async def list_documents(self, limit: int = 50, cursor: Optional[str] = None, hydrate: bool = False) -> dict:
+        ids, next_cursor = await self.index.cursor_page(cursor, limit)
+        if not hydrate:
+            return {"items": ids, "next_cursor": next_cursor}
+
+        docs = await self.get_documents(ids)
+        return {"items": [_summary(doc) for doc in docs], "next_cursor": next_cursor}
+
+    async def latest_documents(self, limit: int = 4, hydrate: bool = False) -> list:
+        """Newest non-deleted documents, one reverse scan of the time index."""
+        ids = await self.timeline.latest(limit)
+        if not hydrate:
+            return ids
+        docs = await self.get_documents(ids)
+        return [doc for doc in docs if not doc.get("deleted")]
+
+
+def _summary(doc: dict) -> dict:
+    return {key: value for key, value in doc.items() if key not in SUMMARY_EXCLUDE}
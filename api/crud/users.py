@@ -1,45 +1,63 @@
-import json
+from typing import Optional
 from db.immudb_client import immudb
+from db.codec import codec
+from crud.index import KeyIndex, MARKER, decode_cursor, encode_cursor
 from core.config import settings
 
 USER_PREFIX = b"user:"
 USER_INDEX = b"user:index"
 
 
-def _load_index() -> list:
-    entry = immudb.get(USER_INDEX)
-    print(USER_INDEX, entry)
-    if not entry:
-        print("No index found, returning empty list")
-        return []
-    try:
-        print("Loading index from immudb")
-        return json.loads(entry.value.decode())
-    except:
-        print("Failed to load index, returning empty list")
-        return []
-    
-def _save_index(index: list):
-    immudb.set(USER_INDEX, json.dumps(index).encode())
+_index = KeyIndex(USER_INDEX)
+
+
+async def migrate_index() -> int:
+    return await _index.migrate()
+
 
-def save_user(username: str, hashed_password: str, role: str):
+async def save_user(username: str, hashed_password: str, role: str):
     key = USER_PREFIX + username.encode()
-    value = json.dumps({
+    value = codec.encode({
         "password": hashed_password,
         "role": role
-    }).encode()
+    })
     
-    immudb.set(key, value)
+    await immudb.set_all({key: value, _index.marker(username): MARKER})
 
-    idx = _load_index()
-    idx.append(username)
-    _save_index(idx)
+async def list_users(limit: int = 100, cursor: Optional[str] = None, role: Optional[str] = None) -> dict:
+    """Page through users, reading each page of records with one getAll."""
+    items = []
+    after = decode_cursor(cursor)
+    exhausted = False
 
-def list_users() -> list[str]:
-    return _load_index()
+    while len(items) < limit:
+        usernames = await _index.page(after, limit)
+        if not usernames:
+            exhausted = True
+            break
+        entries = await immudb.get_all([USER_PREFIX + name.encode() for name in usernames])
 
+        for username in usernames:
+            after = username
+            value = entries.get(USER_PREFIX + username.encode())
+            if not value:
+                continue
+            user_role = codec.decode(value).get("role", "viewer")
+            if role and user_role != role:
+                continue
+            items.append({"id": username, "username": username, "role": user_role})
+            if len(items) == limit:
+                break
 
-def get_user(username: str):
+        if len(items) < limit and len(usernames) < limit:
+            exhausted = True
+            break
+
+    next_cursor = encode_cursor(after) if after and not exhausted else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+async def get_user(username: str):
     if username == settings.root_username:
         return {
             "password": settings.root_password,
@@ -47,18 +65,14 @@ def get_user(username: str):
         }
 
     key = USER_PREFIX + username.encode()
-    entry = immudb.get(key)
+    entry = await immudb.get(key)
 
     if not entry:
         return None
     
-    return json.loads(entry.value.decode())
+    return codec.decode(entry.value)
 
-def delete_user(username: str):
+async def delete_user(username: str):
     key = USER_PREFIX + username.encode()
-    immudb.delete(key)
-    
-    idx = _load_index()
-    if username in idx:
-        idx.remove(username)
-        _save_index(idx)
\ No newline at end of file
+    await immudb.delete(key)
+    await _index.remove(username)
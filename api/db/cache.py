@@ -0,0 +1,186 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryCacheBackend:
+    """Process-local LRU with a TTL, bounded by entry count and total bytes."""
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._entries: OrderedDict[bytes, tuple[float, bytes]] = OrderedDict()
+        self._bytes = 0
+
+    async def get(self, key: bytes) -> Optional[bytes]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._drop(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: bytes, value: bytes):
+        if len(value) > self.max_bytes:
+            return
+        self._drop(key)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._bytes += len(value)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    async def delete(self, key: bytes):
+        self._drop(key)
+
+    def _drop(self, key: bytes):
+        item = self._entries.pop(key, None)
+        if item is not None:
+            self._bytes -= len(item[1])
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "evictions": self.evictions,
+        }
+
+
+class RedisCacheBackend:
+    """Shared cache for several API workers.
+
+    Works with any Redis-compatible client; size limits are left to the
+    server's maxmemory policy, so evictions are not counted here.
+    """
+
+    # an invalidation leaves a short-lived fence that keeps other workers'
+    # in-flight reads from putting the old value back
+    FENCE_SECONDS = 5
+
+    def __init__(self, client, ttl_seconds: float, namespace: bytes = b"cache:"):
+        self._client = client
+        self.ttl_seconds = ttl_seconds
+        self.namespace = namespace
+
+    async def get(self, key: bytes) -> Optional[bytes]:
+        return await self._client.get(self.namespace + key)
+
+    async def set(self, key: bytes, value: bytes):
+        if await self._client.exists(self.namespace + b"fence:" + key):
+            return
+        await self._client.set(self.namespace + key, value, ex=int(self.ttl_seconds))
+
+    async def delete(self, key: bytes):
+        pipe = self._client.pipeline()
+        pipe.set(self.namespace + b"fence:" + key, b"1", ex=self.FENCE_SECONDS)
+        pipe.delete(self.namespace + key)
+        await pipe.execute()
+
+    def stats(self) -> dict:
+        return {}
+
+
+class DocumentCache:
+    """Read-through cache for raw immudb values, keyed by the immudb key.
+
+    A reader takes a ``token()`` before going to immudb and passes it to
+    ``set``. If the key was invalidated in between, the value it read may
+    predate the write and is not cached.
+    """
+
+    MAX_TRACKED_WRITES = 10_000
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.stale_fills = 0
+        self._sequence = 0
+        self._written: OrderedDict[bytes, int] = OrderedDict()
+        # highest sequence forgotten from _written; older tokens are refused
+        self._floor = 0
+
+    def token(self) -> int:
+        return self._sequence
+
+    def _is_stale(self, key: bytes, token: int) -> bool:
+        return token < max(self._written.get(key, 0), self._floor)
+
+    async def get(self, key: bytes) -> Optional[bytes]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            logger.warning("Cache get failed for %s: %s", key, e)
+            value = None
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: bytes, value: bytes, token: int):
+        if self._is_stale(key, token):
+            self.stale_fills += 1
+            return
+        try:
+            await self.backend.set(key, value)
+        except Exception as e:
+            logger.warning("Cache set failed for %s: %s", key, e)
+
+    async def invalidate(self, key: bytes):
+        self._sequence += 1
+        self._written[key] = self._sequence
+        self._written.move_to_end(key)
+        while len(self._written) > self.MAX_TRACKED_WRITES:
+            _, sequence = self._written.popitem(last=False)
+            self._floor = max(self._floor, sequence)
+        try:
+            await self.backend.delete(key)
+        except Exception as e:
+            logger.warning("Cache invalidate failed for %s: %s", key, e)
+
+    def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale_fills": self.stale_fills,
+            **self.backend.stats(),
+        }
+
+
+def _create_backend():
+    backend = settings.document_cache_backend
+    ttl = settings.document_cache_ttl_seconds
+
+    if backend == "redis":
+        import redis.asyncio as redis
+
+        return RedisCacheBackend(redis.from_url(settings.redis_url), ttl)
+    if backend == "fakeredis":
+        # in-process stand-in for redis, handy for local runs without a server
+        from fakeredis import FakeAsyncRedis
+
+        return RedisCacheBackend(FakeAsyncRedis(), ttl)
+    if backend != "memory":
+        raise ValueError(f"Unknown document cache backend: {backend}")
+
+    return MemoryCacheBackend(
+        max_entries=settings.document_cache_max_entries,
+        max_bytes=settings.document_cache_max_bytes,
+        ttl_seconds=ttl,
+    )
+
+
+document_cache = DocumentCache(_create_backend())
@@ -0,0 +1,75 @@
+import orjson
+
+from core.config import settings
+
+# First byte of every value written by RecordCodec. Values written before the
+# codec existed are plain JSON and start with "{" or "[", which can never
+# collide with these, so both kinds can be read side by side and old values
+# get converted lazily the next time they are written.
+FORMAT_ORJSON = 0x01
+FORMAT_MSGPACK = 0x02
+FLAG_ZSTD = 0x80
+
+
+class RecordCodec:
+    def __init__(self, fmt: str, compression_threshold: int = 0, compression_level: int = 3):
+        if fmt not in ("orjson", "msgpack"):
+            raise ValueError(f"Unknown record codec: {fmt}")
+        self.format = FORMAT_ORJSON if fmt == "orjson" else FORMAT_MSGPACK
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+        self._compressor = None
+        self._decompressor = None
+
+        if self.format == FORMAT_MSGPACK:
+            import msgpack  # noqa: F401  fail at startup rather than on first write
+
+    def encode(self, obj) -> bytes:
+        if self.format == FORMAT_MSGPACK:
+            import msgpack
+
+            body = msgpack.packb(obj, use_bin_type=True)
+        else:
+            body = orjson.dumps(obj)
+
+        header = self.format
+        if self.compression_threshold and len(body) >= self.compression_threshold:
+            body = self._get_compressor().compress(body)
+            header |= FLAG_ZSTD
+        return bytes([header]) + body
+
+    def decode(self, value: bytes):
+        header = value[0]
+        if header & ~FLAG_ZSTD not in (FORMAT_ORJSON, FORMAT_MSGPACK):
+            # legacy json.dumps(...).encode() value
+            return orjson.loads(value)
+
+        body = value[1:]
+        if header & FLAG_ZSTD:
+            body = self._get_decompressor().decompress(body)
+        if header & ~FLAG_ZSTD == FORMAT_MSGPACK:
+            import msgpack
+
+            return msgpack.unpackb(body, raw=False)
+        return orjson.loads(body)
+
+    def _get_compressor(self):
+        if self._compressor is None:
+            import zstandard
+
+            self._compressor = zstandard.ZstdCompressor(level=self.compression_level)
+        return self._compressor
+
+    def _get_decompressor(self):
+        if self._decompressor is None:
+            import zstandard
+
+            self._decompressor = zstandard.ZstdDecompressor()
+        return self._decompressor
+
+
+codec = RecordCodec(
+    settings.record_codec,
+    compression_threshold=settings.record_compression_threshold,
+    compression_level=settings.record_compression_level,
+)
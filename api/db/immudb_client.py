@@ -1,23 +1,329 @@
+import asyncio
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, TypeVar
+
+import grpc
 from immudb import ImmudbClient
+from immudb.datatypesv2 import DeleteKeysRequest
 from core.config import settings
 
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TRANSPORT_ERRORS = {
+    grpc.StatusCode.UNAVAILABLE,
+    grpc.StatusCode.DEADLINE_EXCEEDED,
+    grpc.StatusCode.CANCELLED,
+    grpc.StatusCode.RESOURCE_EXHAUSTED,
+}
+
+
+class ImmudbUnavailableError(Exception):
+    """immudb could not be reached or did not answer in time; safe to retry."""
+
+
+def _is_not_found(err: grpc.RpcError) -> bool:
+    return err.code() == grpc.StatusCode.NOT_FOUND or "key not found" in (err.details() or "")
+
+
+def _is_session_expired(err: grpc.RpcError) -> bool:
+    details = (err.details() or "").lower()
+    return err.code() == grpc.StatusCode.UNAUTHENTICATED or "token" in details or "session" in details
+
+
+class ImmudbPool:
+    """Fixed-size pool of logged-in immudb clients.
+
+    Connections are opened lazily on first use. A client whose session
+    expired is logged in again and the call retried once; a client that hit
+    a transport error is thrown away and the error surfaces as
+    ImmudbUnavailableError.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: queue.LifoQueue[ImmudbClient] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self) -> ImmudbClient:
+        client = ImmudbClient(
+            f"{settings.immudb_host}:{settings.immudb_port}",
+            timeout=settings.immudb_connect_timeout_seconds,
+        )
+        client.login(settings.immudb_username, settings.immudb_password)
+        return client
+
+    def _acquire(self) -> ImmudbClient:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            create = self._created < self.size
+            if create:
+                self._created += 1
+        if create:
+            try:
+                return self._connect()
+            except Exception as e:
+                with self._lock:
+                    self._created -= 1
+                raise ImmudbUnavailableError(f"Failed to connect to immudb: {e}") from e
+
+        try:
+            return self._idle.get(timeout=settings.immudb_call_timeout_seconds)
+        except queue.Empty:
+            raise ImmudbUnavailableError("Timed out waiting for an immudb connection")
+
+    def _release(self, client: ImmudbClient):
+        self._idle.put(client)
+
+    def _discard(self, client: ImmudbClient):
+        with self._lock:
+            self._created -= 1
+        try:
+            client.shutdown()
+        except Exception:
+            pass
+
+    def call(self, fn: Callable[[ImmudbClient], T]) -> T:
+        client = self._acquire()
+        try:
+            try:
+                result = fn(client)
+            except grpc.RpcError as e:
+                if e.code() in TRANSPORT_ERRORS or not _is_session_expired(e):
+                    raise
+                logger.info("immudb session expired, logging in again")
+                client.login(settings.immudb_username, settings.immudb_password)
+                result = fn(client)
+        except grpc.RpcError as e:
+            if e.code() in TRANSPORT_ERRORS:
+                self._discard(client)
+                raise ImmudbUnavailableError(f"immudb call failed: {e.details()}") from e
+            self._release(client)
+            raise
+        except Exception:
+            self._release(client)
+            raise
+        self._release(client)
+        return result
+
+    def ping(self):
+        """Health-check idle connections so sessions stay alive and dead ones get dropped."""
+        for _ in range(self._idle.qsize()):
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                client.healthCheck()
+            except Exception as e:
+                logger.info("Dropping idle immudb connection: %s", e)
+                self._discard(client)
+            else:
+                self._idle.put(client)
+
+    def close(self):
+        while True:
+            try:
+                client = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._discard(client)
 
 
 class ImmudbWrapper:
-    def __init__(self):
-        self.client = ImmudbClient(f"{settings.immudb_host}:{settings.immudb_port}")
-        self.client.login(settings.immudb_username, settings.immudb_password)
+    def __init__(self, pool: ImmudbPool):
+        self.pool = pool
 
 
     def set(self, key: bytes, value: bytes):
-        return self.client.set(key, value)
+        return self.pool.call(lambda client: client.set(key, value))
 
 
     def get(self, key: bytes):
         try:
-            return self.client.get(key)
-        except Exception:
-            return None
+            return self.pool.call(lambda client: client.get(key))
+        except grpc.RpcError as e:
+            if _is_not_found(e):
+                return None
+            raise
+
+
+    def get_all(self, keys: list[bytes]) -> dict[bytes, bytes]:
+        return self.pool.call(lambda client: client.getAll(keys))
+
+
+    def set_all(self, kv: dict[bytes, bytes]):
+        return self.pool.call(lambda client: client.setAll(kv))
+
+
+    def scan(self, seek_key: bytes, prefix: bytes, desc: bool, limit: int) -> dict[bytes, bytes]:
+        return self.pool.call(lambda client: client.scan(seek_key, prefix, desc, limit))
+
+
+    def delete_all(self, keys: list[bytes]):
+        return self.pool.call(lambda client: client.delete(DeleteKeysRequest(keys=keys)))
+
+
+    def delete(self, key: bytes):
+        """Delete ``key``; a key that is already gone counts as deleted."""
+        try:
+            return self.pool.call(lambda client: client.delete(DeleteKeysRequest(keys=[key])))
+        except grpc.RpcError as e:
+            if _is_not_found(e):
+                return None
+            raise
+
+
+class AsyncImmudbWrapper:
+    """Awaitable facade over ImmudbWrapper.
+
+    immudb-py is a blocking gRPC client, so every call is pushed onto a
+    dedicated thread pool with one thread per pooled connection. Calls that
+    take longer than IMMUDB_CALL_TIMEOUT_SECONDS raise ImmudbUnavailableError.
+    """
+
+    def __init__(self, wrapper: ImmudbWrapper, max_workers: int):
+        self._wrapper = wrapper
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="immudb"
+        )
+        self._keepalive: asyncio.Task | None = None
+
+    async def _run(self, fn, *args):
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self._executor, partial(fn, *args))
+        try:
+            return await asyncio.wait_for(future, settings.immudb_call_timeout_seconds)
+        except asyncio.TimeoutError:
+            raise ImmudbUnavailableError("immudb call timed out")
+
+    async def set(self, key: bytes, value: bytes):
+        return await self._run(self._wrapper.set, key, value)
+
+    async def get(self, key: bytes):
+        return await self._run(self._wrapper.get, key)
+
+    async def get_all(self, keys: list[bytes]) -> dict[bytes, bytes]:
+        return await self._run(self._wrapper.get_all, keys)
+
+    async def set_all(self, kv: dict[bytes, bytes]):
+        return await self._run(self._wrapper.set_all, kv)
+
+    async def scan(self, seek_key: bytes, prefix: bytes, desc: bool, limit: int) -> dict[bytes, bytes]:
+        return await self._run(self._wrapper.scan, seek_key, prefix, desc, limit)
+
+    async def delete(self, key: bytes):
+        return await self._run(self._wrapper.delete, key)
+
+    async def delete_all(self, keys: list[bytes]):
+        return await self._run(self._wrapper.delete_all, keys)
+
+    def start_keepalive(self, interval: float):
+        self._keepalive = asyncio.create_task(self._keepalive_loop(interval))
+
+    async def _keepalive_loop(self, interval: float):
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self._run(self._wrapper.pool.ping)
+            except Exception as e:
+                logger.warning("immudb keepalive failed: %s", e)
+
+    def close(self):
+        if self._keepalive:
+            self._keepalive.cancel()
+        self._executor.shutdown(wait=False)
+        self._wrapper.pool.close()
+
+
+class GroupCommitter:
+    """Coalesces concurrent writes into one immudb setAll transaction.
+
+    Writes arriving within ``window_ms`` of each other share a transaction.
+    Transactions are committed one after another, so while one is in flight
+    the next batch keeps filling up. A batch is cut early when it reaches
+    ``max_keys`` or when a write touches a key that is already pending,
+    because immudb rejects duplicate keys inside one setAll.
+    """
+
+    def __init__(self, client: AsyncImmudbWrapper, window_ms: float, max_keys: int):
+        self._client = client
+        self._window = window_ms / 1000
+        self._max_keys = max_keys
+        self._pending: dict[bytes, bytes] = {}
+        self._waiters: list[asyncio.Future] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._last_commit: asyncio.Task | None = None
+
+    async def set_all(self, kv: dict[bytes, bytes]):
+        loop = asyncio.get_running_loop()
+        if self._pending.keys() & kv.keys():
+            self._flush()
+
+        self._pending.update(kv)
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+
+        if len(self._pending) >= self._max_keys:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window, self._flush)
+
+        return await waiter
+
+    async def set(self, key: bytes, value: bytes):
+        return await self.set_all({key: value})
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        kv, waiters = self._pending, self._waiters
+        self._pending, self._waiters = {}, []
+        self._last_commit = asyncio.create_task(
+            self._commit(kv, waiters, self._last_commit)
+        )
+
+    async def _commit(self, kv: dict[bytes, bytes], waiters: list[asyncio.Future], previous):
+        if previous is not None:
+            # keep transactions in submission order; the previous batch
+            # reports its own failure to its own waiters
+            try:
+                await previous
+            except Exception:
+                pass
+
+        try:
+            header = await self._client.set_all(kv)
+        except Exception as e:
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_exception(e)
+            return
+
+        for waiter in waiters:
+            if not waiter.done():
+                waiter.set_result(header)
 
 
-immudb = ImmudbWrapper()
\ No newline at end of file
+immudb = AsyncImmudbWrapper(
+    ImmudbWrapper(ImmudbPool(settings.immudb_pool_size)), settings.immudb_pool_size
+)
+group_commit = GroupCommitter(
+    immudb,
+    window_ms=settings.immudb_group_commit_window_ms,
+    max_keys=settings.immudb_group_commit_max_keys,
+)
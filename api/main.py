@@ -1,32 +1,60 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
-from services.elasticService import document_service
+from services.elasticService import bulk_indexer, collection_services
+from services.vectorService import vector_service
 from db.es_client import es_client
+from db.immudb_client import immudb, ImmudbUnavailableError
+from core.config import settings
 
-from routes import auth, documents, users, news, learn
+from routes import auth, documents, users, news, learn, metrics, search
+import crud.documents
+import crud.news
+import crud.learn
+import crud.users
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    immudb.start_keepalive(settings.immudb_keepalive_seconds)
+
+    # convert legacy JSON list indexes into per-id marker keys (no-op once done)
+    for module in (crud.documents, crud.news, crud.learn, crud.users):
+        await module.migrate_index()
+
     try:
-        await document_service.create_index()
+        for service in collection_services.values():
+            await service.create_index()
     except Exception as e:
         raise RuntimeError(f"Failed to initialize Elasticsearch index: {e}")
     yield
 
+    await bulk_indexer.close()
+    await vector_service.close()
     await es_client.close()
+    immudb.close()
 
 app = FastAPI(title="mcHackersApi", lifespan=lifespan)
 
 
 
+@app.exception_handler(ImmudbUnavailableError)
+async def immudb_unavailable_handler(request: Request, exc: ImmudbUnavailableError):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Storage temporarily unavailable"},
+        headers={"Retry-After": "1"},
+    )
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Seq-No", "X-Primary-Term"],
 )
 
 app.include_router(auth.router)
@@ -34,6 +62,8 @@ app.include_router(documents.router)
 app.include_router(users.router)
 app.include_router(news.router)
 app.include_router(learn.router)
+app.include_router(search.router)
+app.include_router(metrics.router)
 
 if __name__ == "__main__":
     import uvicorn
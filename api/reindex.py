@@ -0,0 +1,95 @@
+import argparse
+import asyncio
+
+import crud.documents
+import crud.learn
+import crud.news
+from crud.index import SCAN_PAGE_SIZE
+from crud.repository import CollectionRepository
+from db.immudb_client import immudb
+from schemas.documents import DocumentBase
+from services.elasticService import DocumentService, bulk_indexer, collection_services
+from services.vectorService import vector_service
+from db.es_client import es_client
+
+repositories = {
+    "documents": crud.documents.repository,
+    "news": crud.news.repository,
+    "learn": crud.learn.repository,
+}
+
+
+async def backfill(service: DocumentService, repository: CollectionRepository) -> int:
+    """Index every live immudb record of the collection, one page at a time."""
+    count = 0
+    ids = []
+    async for doc_id in repository.index.iter_ids():
+        ids.append(doc_id)
+        if len(ids) == SCAN_PAGE_SIZE:
+            count += await _backfill_page(service, repository, ids)
+            ids = []
+    if ids:
+        count += await _backfill_page(service, repository, ids)
+    return count
+
+
+async def _backfill_page(service: DocumentService, repository: CollectionRepository, ids: list[str]) -> int:
+    documents = []
+    for doc in await repository.get_documents(ids):
+        try:
+            documents.append(DocumentBase(**doc))
+        except Exception as e:
+            print("Skipping", doc.get("id"), e)
+    return await service.index_documents(documents)
+
+
+async def main(collection: str, version: int | None, vectors: bool, from_immudb: bool):
+    service = collection_services[collection]
+    try:
+        if from_immudb:
+            count = await backfill(service, repositories[collection])
+            print(f"{service.collection}: indexed {count} documents from immudb")
+            return
+        if vectors:
+            count = await service.reembed_all()
+            print(f"{service.collection}: re-embedded {count} documents")
+            return
+        target = await service.reindex(version)
+        print(f"{service.index_name} -> {target}")
+    finally:
+        await bulk_indexer.close()
+        await es_client.close()
+        if vectors or from_immudb:
+            await vector_service.close()
+        if from_immudb:
+            immudb.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rebuild a collection index with the current mapping and swap the alias."
+    )
+    parser.add_argument(
+        "--collection",
+        choices=sorted(collection_services),
+        default="documents",
+    )
+    parser.add_argument(
+        "--version",
+        type=int,
+        default=None,
+        help="target index version (defaults to DOCUMENTS_INDEX_VERSION)",
+    )
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--vectors",
+        action="store_true",
+        help="rewrite the collection's Qdrant passages from the search index instead",
+    )
+    mode.add_argument(
+        "--from-immudb",
+        action="store_true",
+        help="index the collection's immudb records into Elasticsearch and Qdrant instead",
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.collection, args.version, args.vectors, args.from_immudb))
@@ -11,7 +11,7 @@ router = APIRouter(prefix="", tags=["auth"])
 
 @router.post("/login", response_model=users.Token)
 async def login(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = crud.get_user(form_data.username)
+    user = await crud.get_user(form_data.username)
 
     if user["role"] == "root":
         access_token = create_access_token({
@@ -1,18 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
+from typing import List, Optional
 from uuid import UUID
 
-from schemas.documents import DocumentBase, DocumentOut, DocumentUpdate, SearchQuery
+from schemas.documents import DocumentBase, DocumentBatchRequest, DocumentOut, DocumentPage, DocumentUpdate, DocumentVersion, FacetResponse, SearchFilters, SearchQuery
 from core.security import get_current_user, require_role
 from crud.documents import (
     create_document,
     get_document,
+    get_documents,
+    latest_documents,
     list_documents,
     update_document,
     delete_document,
 )
-from services.elasticService import document_service
+from services.elasticService import document_service, DocumentConflictError, InvalidCursorError
+from routes.search import search_filters
 
-router = APIRouter(prefix="/documents", tags=["documents"])
+def set_version_headers(response: Response, version: Optional[DocumentVersion]):
+    """Expose the values callers pass back as if_seq_no/if_primary_term."""
+    if version:
+        response.headers["X-Seq-No"] = str(version.seq_no)
+        response.headers["X-Primary-Term"] = str(version.primary_term)
+
+
+# the hot read routes return ORJSONResponse themselves: records come out of
+# immudb as plain dicts, and a response_model would validate and re-encode
+# each one through Pydantic before orjson ever sees it
+router = APIRouter(prefix="/documents", tags=["documents"], default_response_class=ORJSONResponse)
 
 
 @router.post("/create", response_model=DocumentOut, status_code=status.HTTP_201_CREATED)
@@ -22,7 +38,7 @@ async def create_doc(
     allowed=Depends(require_role("manager")),
 ):
     creator = user["username"]
-    doc = create_document(payload.model_dump(), creator)
+    doc = await create_document(payload.model_dump(), creator)
     elastic_doc = await document_service.create_document(payload)
     print(elastic_doc)
     return doc
@@ -33,14 +49,26 @@ async def simple_search(
     q: str,
     limit: int = 10,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    full_content: bool = False,
+    filters: Optional[SearchFilters] = Depends(search_filters),
     user=Depends(get_current_user),
     allowed=Depends(require_role("viewer")),
 ):
     try:
-        search_query = SearchQuery(query=q, size=limit, from_=offset)
+        search_query = SearchQuery(
+            query=q,
+            size=limit,
+            from_=offset,
+            cursor=cursor,
+            full_content=full_content,
+            filters=filters,
+        )
         res = await document_service.search_documents(search_query)
         print(res)
         return res
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -48,25 +76,86 @@ async def simple_search(
         )
 
 
-@router.get("/all")
+@router.get("/facets", response_model=FacetResponse)
+async def facet_counts(
+    q: Optional[str] = None,
+    size: int = Query(20, ge=1, le=500),
+    filters: Optional[SearchFilters] = Depends(search_filters),
+    user=Depends(get_current_user),
+    allowed=Depends(require_role("viewer")),
+):
+    try:
+        return await document_service.facets(query=q, filters=filters, size=size)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Facets failed: {e}",
+        )
+
+
+@router.get("/export")
+async def export_docs(
+    user=Depends(get_current_user), allowed=Depends(require_role("manager"))
+):
+    async def ndjson():
+        async for doc in document_service.iter_all_documents():
+            yield orjson.dumps(doc.model_dump(mode="json")) + b"\n"
+
+    return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+
+@router.get("/all", responses={200: {"model": DocumentPage}})
 async def list_docs(
-    user=Depends(get_current_user), allowed=Depends(require_role("viewer"))
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    hydrate: bool = False,
+    user=Depends(get_current_user),
+    allowed=Depends(require_role("viewer")),
 ):
     print("Listing documents for user:", user["username"])
-    return list_documents()
+    try:
+        page = await list_documents(limit=limit, cursor=cursor, hydrate=hydrate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ORJSONResponse(page)
+
+
+@router.get("/last")
+async def latest_docs(
+    limit: int = Query(4, ge=1, le=100),
+    hydrate: bool = False,
+    user=Depends(get_current_user),
+    allowed=Depends(require_role("viewer")),
+):
+    return ORJSONResponse(await latest_documents(limit=limit, hydrate=hydrate))
+
+
+@router.post("/batch", responses={200: {"model": List[DocumentOut]}})
+async def read_docs_batch(
+    payload: DocumentBatchRequest,
+    user=Depends(get_current_user),
+    allowed=Depends(require_role("viewer")),
+):
+    return ORJSONResponse(await get_documents(payload.ids))
 
 
 @router.put("/update", response_model=DocumentOut)
 async def read_doc(
     payload: DocumentBase,
+    response: Response,
+    if_seq_no: Optional[int] = None,
+    if_primary_term: Optional[int] = None,
     user=Depends(get_current_user),
     allowed=Depends(require_role("manager")),
 ):
-    doc = update_document(payload)
-    if not doc:
+    if not await get_document(payload.id):
         raise HTTPException(status_code=405, detail="Document not found")
+
+    # the search index goes first so a lost optimistic-concurrency race is
+    # rejected before immudb records the edit
+    guarded = if_seq_no is not None and if_primary_term is not None
     try:
-        await document_service.update_document(
+        updated = await document_service.update_document(
             UUID(payload.id),
             DocumentUpdate(
                 title=payload.title,
@@ -75,21 +164,56 @@ async def read_doc(
                 tags=payload.tags,
                 metadata=payload.metadata,
             ),
+            if_seq_no=if_seq_no,
+            if_primary_term=if_primary_term,
         )
-    except Exception:
+    except DocumentConflictError:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Document was modified concurrently, reload and retry",
+        )
+    except Exception as e:
+        if guarded:
+            # the version can't be checked, so the edit must not go through
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Could not verify the document version: {e}",
+            )
         # Keep original behavior even if search index update fails.
-        pass
+        updated = None
+    if updated:
+        set_version_headers(response, updated[1])
+    elif guarded:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Document is not in the search index, reload and retry",
+        )
+
+    doc = await update_document(payload)
+    if not doc:
+        raise HTTPException(status_code=405, detail="Document not found")
     return doc
 
 
-@router.get("/", response_model=DocumentOut)
+@router.get("/", responses={200: {"model": DocumentOut}})
 async def read_doc(
-    doc_id: str, user=Depends(get_current_user), allowed=Depends(require_role("viewer"))
+    doc_id: str,
+    with_version: bool = False,
+    user=Depends(get_current_user),
+    allowed=Depends(require_role("viewer")),
 ):
-    doc = get_document(doc_id)
+    doc = await get_document(doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
-    return doc
+    response = ORJSONResponse(doc)
+    if with_version:
+        # costs an extra search index round trip, so only editors ask for it
+        try:
+            set_version_headers(response, await document_service.get_version(UUID(doc_id)))
+        except Exception:
+            # the version only enables guarded edits; the read itself succeeded
+            pass
+    return response
 
 
 @router.delete("/", response_model=DocumentOut)
@@ -98,7 +222,7 @@ async def delete_doc(
     user=Depends(get_current_user),
     allowed=Depends(require_role("manager")),
 ):
-    doc = delete_document(doc_id)
+    doc = await delete_document(doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
     try:
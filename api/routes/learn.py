@@ -1,42 +1,89 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from schemas.documents import DocumentBase, DocumentOut
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from uuid import UUID
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional
+from schemas.documents import DocumentBase, DocumentBatchRequest, DocumentOut, DocumentPage, DocumentUpdate
 from core.security import get_current_user, require_role
-from crud.learn import create_document, get_document, list_documents, update_document, delete_document
-from services.elasticService import document_service
+from crud.learn import create_document, get_document, get_documents, latest_documents, list_documents, update_document, delete_document
+from services.elasticService import learn_service, DocumentConflictError
+from routes.documents import set_version_headers
 
-router = APIRouter(prefix="/learn", tags=["learn"])
+router = APIRouter(prefix="/learn", tags=["learn"], default_response_class=ORJSONResponse)
 
 
 @router.post("/create", response_model=DocumentOut, status_code=status.HTTP_201_CREATED)
 async def create_doc(payload: DocumentBase, user = Depends(get_current_user), allowed = Depends(require_role("manager"))):
     creator = user["username"]
-    doc = create_document(payload.model_dump(), creator)
+    doc = await create_document(payload.model_dump(), creator)
+    try:
+        await learn_service.create_document(payload)
+    except Exception:
+        # the immudb record is the source of truth; search indexing is best effort
+        pass
     return doc
 
     
-@router.get("/all")
-async def list_docs(user = Depends(get_current_user), allowed = Depends(require_role("viewer"))):
+@router.get("/all", responses={200: {"model": DocumentPage}})
+async def list_docs(limit: int = Query(50, ge=1, le=500), cursor: Optional[str] = None, hydrate: bool = False, user = Depends(get_current_user), allowed = Depends(require_role("viewer"))):
     print("Listing documents for user:", user["username"])
-    return list_documents()
+    try:
+        page = await list_documents(limit=limit, cursor=cursor, hydrate=hydrate)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ORJSONResponse(page)
 
 
+@router.get("/last")
+async def latest_docs(limit: int = Query(4, ge=1, le=100), hydrate: bool = False, user = Depends(get_current_user), allowed = Depends(require_role("viewer"))):
+    return ORJSONResponse(await latest_documents(limit=limit, hydrate=hydrate))
+
+@router.post("/batch", responses={200: {"model": List[DocumentOut]}})
+async def read_docs_batch(payload: DocumentBatchRequest, user = Depends(get_current_user), allowed = Depends(require_role("viewer"))):
+    return ORJSONResponse(await get_documents(payload.ids))
+
 @router.put("/update", response_model=DocumentOut)
-async def read_doc(payload: DocumentBase, user = Depends(get_current_user), allowed = Depends(require_role("manager"))):
-    doc = update_document(payload)
+async def read_doc(payload: DocumentBase, response: Response, if_seq_no: Optional[int] = None, if_primary_term: Optional[int] = None, user = Depends(get_current_user), allowed = Depends(require_role("manager"))):
+    if not await get_document(payload.id):
+        raise HTTPException(status_code=405, detail="Document not found")
+    # search index first, so a lost race is rejected before immudb records it
+    guarded = if_seq_no is not None and if_primary_term is not None
+    try:
+        updated = await learn_service.update_document(UUID(payload.id), DocumentUpdate(title=payload.title, content=payload.content, author=payload.author, tags=payload.tags, metadata=payload.metadata), if_seq_no=if_seq_no, if_primary_term=if_primary_term)
+    except DocumentConflictError:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Document was modified concurrently, reload and retry")
+    except Exception as e:
+        if guarded:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=f"Could not verify the document version: {e}")
+        updated = None
+    if updated:
+        set_version_headers(response, updated[1])
+    elif guarded:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Document is not in the search index, reload and retry")
+    doc = await update_document(payload)
     if not doc:
         raise HTTPException(status_code=405, detail="Document not found")
     return doc
 
-@router.get("/", response_model=DocumentOut)
-async def read_doc(doc_id: str, user = Depends(get_current_user), allowed = Depends(require_role("viewer"))):
-    doc = get_document(doc_id)
+@router.get("/", responses={200: {"model": DocumentOut}})
+async def read_doc(doc_id: str, with_version: bool = False, user = Depends(get_current_user), allowed = Depends(require_role("viewer"))):
+    doc = await get_document(doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
-    return doc
+    response = ORJSONResponse(doc)
+    if with_version:
+        try:
+            set_version_headers(response, await learn_service.get_version(UUID(doc_id)))
+        except Exception:
+            pass
+    return response
 
 @router.delete("/", response_model=DocumentOut)
 async def delete_doc(doc_id: str, user = Depends(get_current_user), allowed = Depends(require_role("manager"))):
-    doc = delete_document(doc_id)
+    doc = await delete_document(doc_id)
     if not doc:
         raise HTTPException(status_code=404, detail="Document not found")
+    try:
+        await learn_service.delete_document(UUID(doc_id))
+    except Exception:
+        pass
     return doc
@@ -0,0 +1,23 @@
+from fastapi import APIRouter, Depends
+from core.security import get_current_user, require_role
+from db.cache import document_cache
+from core.config import settings
+from services.elasticService import bulk_indexer, collection_services
+from services.vectorService import vector_service
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/")
+async def get_metrics(user = Depends(get_current_user), allowed = Depends(require_role("manager"))):
+    metrics = {
+        "document_cache": document_cache.stats(),
+        "elasticsearch_bulk": bulk_indexer.stats(),
+        "search_cache": {
+            name: service.search_cache.stats()
+            for name, service in collection_services.items()
+        },
+    }
+    if settings.vector_search_enabled:
+        metrics["vector"] = vector_service.stats()
+    return metrics
@@ -0,0 +1,53 @@
+from datetime import datetime
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
+from schemas.documents import MultiSearchResponse, SearchFilters, SearchQuery
+from core.security import get_current_user, require_role
+from services.elasticService import multi_search
+
+router = APIRouter(prefix="/search", tags=["search"], default_response_class=ORJSONResponse)
+
+
+def search_filters(
+    tags: Optional[List[str]] = Query(None),
+    author: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    updated_from: Optional[datetime] = None,
+    updated_to: Optional[datetime] = None,
+    deleted: Optional[bool] = None,
+) -> Optional[SearchFilters]:
+    filters = SearchFilters(
+        tags=tags,
+        author=author,
+        created_from=created_from,
+        created_to=created_to,
+        updated_from=updated_from,
+        updated_to=updated_to,
+        deleted=deleted,
+    )
+    return filters if filters.model_dump(exclude_none=True) else None
+
+
+@router.get("/", response_model=MultiSearchResponse)
+async def search_collections(
+    q: str,
+    collections: List[Literal["documents", "news", "learn"]] = Query(["documents", "news", "learn"]),
+    limit: int = 10,
+    offset: int = 0,
+    full_content: bool = False,
+    filters: Optional[SearchFilters] = Depends(search_filters),
+    user=Depends(get_current_user),
+    allowed=Depends(require_role("viewer")),
+):
+    try:
+        search_query = SearchQuery(
+            query=q, size=limit, from_=offset, full_content=full_content, filters=filters
+        )
+        return await multi_search(search_query, collections)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Search failed: {e}",
+        )
@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
-from pydantic import BaseModel
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, Field
+from typing import Optional, List, Dict, Any, Union
 
 
 class DocumentBase(BaseModel):
@@ -24,6 +24,26 @@ class DocumentOut(DocumentBase):
     updated_at: str
 
 
+class DocumentSummary(BaseModel):
+    id: str
+    deleted: bool
+    title: str
+    author: Optional[str]
+    tags: List[str]
+    creator: Optional[str] = None
+    created_at: str
+    updated_at: str
+
+
+class DocumentPage(BaseModel):
+    items: Union[List[DocumentSummary], List[str]]
+    next_cursor: Optional[str] = None
+
+
+class DocumentBatchRequest(BaseModel):
+    ids: List[str] = Field(max_length=500)
+
+
 class DocumentUpdate(BaseModel):
     title: Optional[str]
     content: Optional[str] 
@@ -32,6 +52,11 @@ class DocumentUpdate(BaseModel):
     metadata: Optional[Dict[str, Any]] 
 
 
+class DocumentVersion(BaseModel):
+    seq_no: int
+    primary_term: int
+
+
 class DocumentResponse(BaseModel):
     id: str
     title: str
@@ -43,13 +68,55 @@ class DocumentResponse(BaseModel):
     updated_at: datetime
 
 
+class SearchHit(BaseModel):
+    id: str
+    title: str
+    author: Optional[str] = None
+    tags: List[str] = []
+    created_at: datetime
+    updated_at: datetime
+    snippet: Optional[str] = None
+    content: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class SearchFilters(BaseModel):
+    tags: Optional[List[str]] = None
+    author: Optional[str] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+    updated_from: Optional[datetime] = None
+    updated_to: Optional[datetime] = None
+    deleted: Optional[bool] = None
+
+
 class SearchQuery(BaseModel):
     query: str
     size: int
     from_: int 
+    cursor: Optional[str] = None
+    full_content: bool = False
+    filters: Optional[SearchFilters] = None
 
 
 class SearchResponse(BaseModel):
     total: int
-    results: List[DocumentResponse]
+    results: List[SearchHit]
+    took: int
+    next_cursor: Optional[str] = None
+
+
+class FacetBucket(BaseModel):
+    key: str
+    count: int
+
+
+class FacetResponse(BaseModel):
+    total: int
+    facets: Dict[str, List[FacetBucket]]
+    took: int
+
+
+class MultiSearchResponse(BaseModel):
+    results: Dict[str, SearchResponse]
     took: int
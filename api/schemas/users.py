@@ -1,4 +1,4 @@
-from typing import Literal
+from typing import List, Literal, Optional
 from pydantic import BaseModel
 
 
@@ -12,3 +12,14 @@ class UserCreate(BaseModel):
     password: str
     role: Literal["viewer", "manager", "root"] = "viewer"
 
+
+
+class UserOut(BaseModel):
+    id: str
+    username: str
+    role: str
+
+
+class UserPage(BaseModel):
+    items: List[UserOut]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,177 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
+
+import orjson
+from elasticsearch import AsyncElasticsearch
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {429, 502, 503, 504}
+
+
+class BulkItemError(Exception):
+    def __init__(self, op: str, doc_id: str, status: int, error: Any):
+        super().__init__(f"Bulk {op} failed for {doc_id} ({status}): {error}")
+        self.status = status
+        self.error = error
+
+
+class _Op:
+    __slots__ = ("action", "source", "future", "size", "attempts")
+
+    def __init__(self, action: Dict[str, Any], source: Optional[Dict[str, Any]], future: asyncio.Future):
+        self.action = action
+        self.source = source
+        self.future = future
+        self.size = len(orjson.dumps(source, default=str)) if source is not None else 0
+        self.attempts = 0
+
+
+class BulkIndexer:
+    """Batches index/update/delete operations into `_bulk` requests.
+
+    Operations are queued and flushed when the batch reaches ``max_actions``
+    operations or ``max_bytes`` of source, or ``flush_interval_ms`` after the
+    first one was queued. Batches are sent one at a time in submission order.
+    Each caller awaits the outcome of its own item. Items rejected with a
+    retryable status (429/5xx) are queued again, up to ``max_retries`` times.
+    """
+
+    def __init__(
+        self,
+        client: AsyncElasticsearch,
+        max_actions: int,
+        max_bytes: int,
+        flush_interval_ms: float,
+        refresh: str,
+        max_retries: int,
+    ):
+        self.client = client
+        self.max_actions = max_actions
+        self.max_bytes = max_bytes
+        self.flush_interval = flush_interval_ms / 1000
+        self.refresh = refresh
+        self.max_retries = max_retries
+
+        self._pending: List[_Op] = []
+        self._pending_bytes = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._last_flush: Optional[asyncio.Task] = None
+        self._stats = {"batches": 0, "items": 0, "errors": 0, "retries": 0}
+
+    async def index(self, index: str, doc_id: str, document: Dict[str, Any]) -> str:
+        item = await self._submit({"index": {"_index": index, "_id": doc_id}}, document)
+        return item["result"]
+
+    async def delete(self, index: str, doc_id: str) -> str:
+        item = await self._submit({"delete": {"_index": index, "_id": doc_id}}, None)
+        return item.get("result", "not_found")
+
+    async def update(
+        self,
+        index: str,
+        doc_id: str,
+        partial: Optional[Dict[str, Any]] = None,
+        if_seq_no: Optional[int] = None,
+        if_primary_term: Optional[int] = None,
+        script: Optional[Dict[str, Any]] = None,
+        upsert: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """Partial (``doc``) or scripted update.
+
+        A stale seq_no/primary_term fails with a 409 BulkItemError. With
+        ``upsert`` a missing document is created from it instead.
+        """
+        meta: Dict[str, Any] = {"_index": index, "_id": doc_id}
+        if if_seq_no is not None and if_primary_term is not None:
+            meta["if_seq_no"] = if_seq_no
+            meta["if_primary_term"] = if_primary_term
+        source = {"script": script} if script is not None else {"doc": partial}
+        if upsert is not None:
+            source["upsert"] = upsert
+        return await self._submit({"update": meta}, source)
+
+    async def _submit(self, action: Dict[str, Any], source: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        op = _Op(action, source, loop.create_future())
+        self._enqueue(op)
+        return await op.future
+
+    def _enqueue(self, op: _Op):
+        self._pending.append(op)
+        self._pending_bytes += op.size
+        if len(self._pending) >= self.max_actions or self._pending_bytes >= self.max_bytes:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._flush)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+
+        ops = self._pending
+        self._pending, self._pending_bytes = [], 0
+        self._last_flush = asyncio.create_task(self._send(ops, self._last_flush))
+
+    async def _send(self, ops: List[_Op], previous: Optional[asyncio.Task]):
+        if previous is not None:
+            try:
+                await previous
+            except Exception:
+                pass
+
+        operations: List[Dict[str, Any]] = []
+        for op in ops:
+            operations.append(op.action)
+            if op.source is not None:
+                operations.append(op.source)
+
+        self._stats["batches"] += 1
+        self._stats["items"] += len(ops)
+        try:
+            response = await self.client.bulk(operations=operations, refresh=self.refresh)
+        except Exception as e:
+            logger.warning("Bulk request with %d items failed: %s", len(ops), e)
+            self._stats["errors"] += len(ops)
+            for op in ops:
+                if not op.future.done():
+                    op.future.set_exception(e)
+            return
+
+        for op, item in zip(ops, response["items"]):
+            self._resolve(op, item)
+
+    def _resolve(self, op: _Op, item: Dict[str, Any]):
+        (op_type, result), = item.items()
+        status = result.get("status", 500)
+        doc_id = result.get("_id")
+
+        if status in RETRYABLE_STATUSES and op.attempts < self.max_retries:
+            op.attempts += 1
+            self._stats["retries"] += 1
+            logger.info("Retrying bulk %s for %s (status %s)", op_type, doc_id, status)
+            loop = asyncio.get_running_loop()
+            loop.call_later(self.flush_interval * (2 ** op.attempts), self._enqueue, op)
+            return
+
+        if op.future.done():
+            return
+        if status < 300 or (op_type == "delete" and status == 404):
+            op.future.set_result(result)
+            return
+
+        self._stats["errors"] += 1
+        logger.warning("Bulk %s failed for %s (%s): %s", op_type, doc_id, status, result.get("error"))
+        op.future.set_exception(BulkItemError(op_type, doc_id, status, result.get("error")))
+
+    async def close(self):
+        self._flush()
+        if self._last_flush is not None:
+            await self._last_flush
+
+    def stats(self) -> dict:
+        return {**self._stats, "pending": len(self._pending)}
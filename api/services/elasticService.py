@@ -1,6 +1,11 @@
 import asyncio
+import base64
+import binascii
 import logging
-from typing import List, Optional, Dict, Any
+import time
+from typing import AsyncIterator, List, Optional, Dict, Any
+
+import orjson
 from uuid import UUID
 from datetime import datetime
 
@@ -13,118 +18,531 @@ from elasticsearch.exceptions import (
 from schemas.documents import (
     DocumentBase,
     DocumentResponse,
+    SearchHit,
     DocumentUpdate,
+    DocumentVersion,
+    FacetBucket,
+    FacetResponse,
+    SearchFilters,
     SearchQuery,
     SearchResponse,
+    MultiSearchResponse,
 )
 from db.es_client import es_client
 from core.config import settings
 from services.vectorService import vector_service
+from services.bulkIndexer import BulkIndexer, BulkItemError
+from services.resultCache import ResultCache
 
 
 logger = logging.getLogger(__name__)
 
+# Substring search runs against these subfields instead of leading-wildcard
+# queries: "ngram" holds every 3-character gram for queries of 3+ characters,
+# "prefix" holds word prefixes for shorter ones.
+SUBSTRING_MIN_LENGTH = 3
+SUBSTRING_FIELDS = {
+    "ngram": {"type": "text", "analyzer": "trigram", "search_analyzer": "trigram"},
+    "prefix": {"type": "text", "analyzer": "edge_prefix", "search_analyzer": "lowercase_word"},
+}
+INDEX_ANALYSIS = {
+    "tokenizer": {
+        "trigram": {
+            "type": "ngram",
+            "min_gram": 3,
+            "max_gram": 3,
+            "token_chars": ["letter", "digit"],
+        },
+        "edge_prefix": {
+            "type": "edge_ngram",
+            "min_gram": 1,
+            "max_gram": 20,
+            "token_chars": ["letter", "digit"],
+        },
+    },
+    "analyzer": {
+        "trigram": {"type": "custom", "tokenizer": "trigram", "filter": ["lowercase"]},
+        "edge_prefix": {"type": "custom", "tokenizer": "edge_prefix", "filter": ["lowercase"]},
+        "lowercase_word": {"type": "custom", "tokenizer": "standard", "filter": ["lowercase"]},
+    },
+}
+
+
+PIT_KEEP_ALIVE = "2m"
+SEARCH_SORT = [{"_score": {"order": "desc"}}, {"id": {"order": "asc"}}]
+HIT_FIELDS = ["id", "title", "author", "tags", "created_at", "updated_at"]
+FULL_HIT_FIELDS = HIT_FIELDS + ["content", "metadata"]
+SNIPPET_SIZE = 160
+FACET_FIELDS = ("tags", "author")
+# a partial ``doc`` update deep-merges objects, which would keep keys removed
+# from metadata; assigning whole fields from a script replaces them instead
+REPLACE_FIELDS_SCRIPT = (
+    "for (entry in params.fields.entrySet()) { ctx._source[entry.getKey()] = entry.getValue(); }"
+)
+LISTING_SORT = [{"created_at": {"order": "desc"}}, {"id": {"order": "asc"}}]
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+class DocumentConflictError(Exception):
+    """The document changed since the caller read it."""
+
+
+def encode_cursor(pit_id: Optional[str], search_after: List[Any]) -> str:
+    raw = orjson.dumps({"pit": pit_id, "after": search_after})
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[Optional[str], List[Any]]:
+    try:
+        data = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return data["pit"], data["after"]
+    except (binascii.Error, orjson.JSONDecodeError, KeyError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
+
+
+bulk_indexer = BulkIndexer(
+    es_client.get_async_client(),
+    max_actions=settings.elasticsearch_bulk_max_actions,
+    max_bytes=settings.elasticsearch_bulk_max_bytes,
+    flush_interval_ms=settings.elasticsearch_bulk_flush_interval_ms,
+    refresh=settings.elasticsearch_refresh,
+    max_retries=settings.elasticsearch_bulk_max_retries,
+)
+
+
+def _hits_from_vector(hits) -> List[SearchHit]:
+    results: List[SearchHit] = []
+    for hit in hits:
+        payload = dict(hit.payload or {})
+        if payload.get("snippet"):
+            payload["snippet"] = payload["snippet"][:SNIPPET_SIZE]
+        try:
+            results.append(SearchHit(**payload))
+        except Exception as parse_err:
+            logger.debug(
+                "Skipping malformed vector payload for %s: %s",
+                payload.get("id"),
+                parse_err,
+            )
+    return results
+
 
 class DocumentService:
-    def __init__(self):
-        self.index_name = settings.documents_index
+    """Search and indexing for one collection (documents, news or learn).
+
+    Every collection has its own Elasticsearch alias and its own partition
+    of the shared Qdrant collection, keyed by the ``collection`` payload field.
+    """
+
+    def __init__(self, collection: str, index_name: str):
+        self.collection = collection
+        self.index_name = index_name
         self.client = es_client.get_async_client()
+        self.bulk_indexer = bulk_indexer
         self.vector_service = vector_service if settings.vector_search_enabled else None
+        self.search_cache = ResultCache(
+            max_entries=settings.search_cache_max_entries,
+            ttl_seconds=settings.search_cache_ttl_seconds,
+        )
+        self._last_write = 0.0
+        self._pending_bump: Optional[asyncio.TimerHandle] = None
+
+    def _invalidate(self):
+        """Drop cached searches after a write.
+
+        Unless writes refresh the index themselves, a search that runs before
+        the next refresh can't see the write yet and would cache the old
+        result under the new generation, so the cache is bumped once more
+        after the refresh lag.
+        """
+        self.search_cache.bump()
+        if settings.elasticsearch_refresh != "false":
+            return
+        self._last_write = time.monotonic()
+        if self._pending_bump is None:
+            self._pending_bump = asyncio.get_running_loop().call_later(
+                settings.search_cache_refresh_lag_seconds, self._delayed_bump
+            )
 
-    async def create_index(self) -> bool:
-        mapping = {
+    def _delayed_bump(self):
+        self.search_cache.bump()
+        self._pending_bump = None
+        # writes that arrived while waiting need their own full lag
+        remaining = self._last_write + settings.search_cache_refresh_lag_seconds - time.monotonic()
+        if remaining > 0:
+            self._pending_bump = asyncio.get_running_loop().call_later(
+                remaining, self._delayed_bump
+            )
+
+    def _index_body(self) -> Dict[str, Any]:
+        return {
+            "settings": {"analysis": INDEX_ANALYSIS},
             "mappings": {
                 "properties": {
                     "id": {"type": "keyword"},
                     "title": {
                         "type": "text",
                         "analyzer": "standard",
-                        "fields": {"keyword": {"type": "keyword"}},
+                        "fields": {"keyword": {"type": "keyword"}, **SUBSTRING_FIELDS},
+                    },
+                    "content": {
+                        "type": "text",
+                        "analyzer": "standard",
+                        "fields": SUBSTRING_FIELDS,
                     },
-                    "content": {"type": "text", "analyzer": "standard"},
                     "author": {"type": "keyword"},
+                    "deleted": {"type": "boolean"},
                     "tags": {"type": "keyword"},
                     "metadata": {"type": "object"},
                     "created_at": {"type": "date"},
                     "updated_at": {"type": "date"},
                 }
-            }
+            },
         }
 
+    def _versioned_index(self, version: int) -> str:
+        return f"{self.index_name}_v{version}"
+
+    async def _alias_targets(self) -> List[str]:
+        if not await self.client.indices.exists_alias(name=self.index_name):
+            return []
+        response = await self.client.indices.get_alias(name=self.index_name)
+        return list(response.keys())
+
+    async def create_index(self) -> bool:
+        """Make sure the read/write alias exists.
+
+        Reads and writes always go through ``settings.documents_index``, which
+        is an alias over ``<name>_v<version>``. Mapping changes are rolled out
+        with ``reindex`` instead of recreating the index in place.
+        """
+        target = self._versioned_index(settings.documents_index_version)
         try:
-            if not await self.client.indices.exists(index=self.index_name):
-                await self.client.indices.create(index=self.index_name, body=mapping)
-                return True
-            return False
+            targets = await self._alias_targets()
+            if targets:
+                if target not in targets:
+                    logger.warning(
+                        "Alias %s points to %s, expected %s; run reindex.py to upgrade",
+                        self.index_name, targets, target,
+                    )
+                return False
+            if await self.client.indices.exists(index=self.index_name):
+                logger.warning(
+                    "%s is a plain index, not an alias; run reindex.py to move it behind one",
+                    self.index_name,
+                )
+                return False
+
+            body = self._index_body()
+            body["aliases"] = {self.index_name: {"is_write_index": True}}
+            await self.client.indices.create(index=target, body=body)
+            return True
         except (NotFoundError, ConnectionError, RequestError, ApiError) as e:
             raise Exception(f"Failed to create index: {e}")
 
+    def _tombstone_index(self) -> str:
+        return f"{self.index_name}_reindex_tombstones"
+
+    async def _run_reindex(self, source: str, target: str):
+        # op_type=create never overwrites a document that a live write put into
+        # the target first, so the newer version always wins
+        response = await self.client.reindex(
+            source={"index": source},
+            dest={"index": target, "op_type": "create"},
+            slices="auto",
+            conflicts="proceed",
+            wait_for_completion=False,
+        )
+        task_id = response["task"]
+        while True:
+            task = await self.client.tasks.get(task_id=task_id)
+            if task.get("completed"):
+                break
+            await asyncio.sleep(2)
+
+        result = task.get("response", {})
+        failures = result.get("failures") or []
+        if task.get("error") or failures:
+            raise Exception(f"Reindex {source} -> {target} failed: {task.get('error') or failures[:5]}")
+        logger.info("Reindexed %s documents from %s into %s", result.get("total"), source, target)
+
+    async def _apply_tombstones(self, target: str):
+        """Delete from ``target`` what was deleted while the copy ran."""
+        tombstones = self._tombstone_index()
+        await self.client.indices.refresh(index=tombstones)
+        search_after: List[Any] = []
+        while True:
+            body: Dict[str, Any] = {"query": {"match_all": {}}, "size": 1000, "sort": [{"id": "asc"}]}
+            if search_after:
+                body["search_after"] = search_after
+            hits = (await self.client.search(index=tombstones, body=body))["hits"]["hits"]
+            if not hits:
+                return
+            await self.client.bulk(
+                operations=[{"delete": {"_index": target, "_id": hit["_id"]}} for hit in hits],
+                refresh=settings.elasticsearch_refresh,
+            )
+            search_after = hits[-1]["sort"]
+
+    async def reindex(self, version: Optional[int] = None) -> str:
+        """Rebuild the index with the current mapping and swap the alias.
+
+        The alias first gains the new index as its write index, so every
+        write from then on lands there, while reads still see the old index.
+        A sliced ``_reindex`` with ``op_type=create`` then copies only the
+        documents that haven't been written since. Deletes made during the
+        copy are recorded as tombstones and replayed afterwards, and finally
+        the old index is dropped from the alias. Until then reads span both
+        indices, so listings and facet counts may briefly show duplicates.
+
+        A pre-alias install (a concrete index under the alias name) cannot
+        share the alias, so it is write-blocked for the duration of the copy.
+        """
+        version = version or settings.documents_index_version
+        target = self._versioned_index(version)
+
+        try:
+            sources = await self._alias_targets()
+            legacy = not sources and await self.client.indices.exists(index=self.index_name)
+            if legacy:
+                sources = [self.index_name]
+            if target in sources:
+                raise Exception(f"{self.index_name} already points to {target}")
+
+            await self.client.indices.create(index=target, body=self._index_body())
+            if not sources:
+                await self.client.indices.update_aliases(
+                    actions=[{"add": {"index": target, "alias": self.index_name, "is_write_index": True}}]
+                )
+                return target
+
+            if legacy:
+                await self._reindex_legacy(target)
+            else:
+                await self._reindex_live(sources, target)
+
+            logger.info("Alias %s now points to %s", self.index_name, target)
+            return target
+        except (NotFoundError, ConnectionError, RequestError, ApiError) as e:
+            raise Exception(f"Failed to reindex: {e}")
+
+    async def _reindex_live(self, sources: List[str], target: str):
+        tombstones = self._tombstone_index()
+        await self.client.indices.create(
+            index=tombstones, mappings={"properties": {"id": {"type": "keyword"}}}
+        )
+        try:
+            await self.client.indices.update_aliases(
+                actions=[
+                    {"add": {"index": target, "alias": self.index_name, "is_write_index": True}},
+                    *(
+                        {"add": {"index": index, "alias": self.index_name, "is_write_index": False}}
+                        for index in sources
+                    ),
+                ]
+            )
+            await self._run_reindex(",".join(sources), target)
+            await self._apply_tombstones(target)
+            await self.client.indices.update_aliases(
+                actions=[{"remove": {"index": index, "alias": self.index_name}} for index in sources]
+            )
+        finally:
+            await self.client.indices.delete(index=tombstones, ignore_unavailable=True)
+
+    async def _reindex_legacy(self, target: str):
+        await self.client.indices.put_settings(
+            index=self.index_name, settings={"index.blocks.write": True}
+        )
+        try:
+            await self._run_reindex(self.index_name, target)
+        except Exception:
+            await self.client.indices.put_settings(
+                index=self.index_name, settings={"index.blocks.write": False}
+            )
+            raise
+        # a concrete index cannot share its name with an alias, so it is
+        # dropped in the same atomic call that creates the alias
+        await self.client.indices.update_aliases(
+            actions=[
+                {"add": {"index": target, "alias": self.index_name, "is_write_index": True}},
+                {"remove_index": {"index": self.index_name}},
+            ]
+        )
+
     async def create_document(self, document: DocumentBase) -> DocumentBase:
 
         try:
-            await self.client.index(
-                index=self.index_name,
-                id=str(document.id),
-                document=document.model_dump(),
-                refresh=True,
+            await self.bulk_indexer.index(
+                self.index_name, str(document.id), document.model_dump()
             )
+            self._invalidate()
             if self.vector_service:
                 try:
-                    await self.vector_service.upsert_document(document)
+                    await self.vector_service.upsert_document(document, self.collection)
                 except Exception as vector_err:
                     logger.warning(
                         "Vector upsert failed for %s: %s", document.id, vector_err
                     )
             return document
-        except (NotFoundError, ConnectionError, RequestError, ApiError) as e:
+        except (NotFoundError, ConnectionError, RequestError, ApiError, BulkItemError) as e:
             raise Exception(f"Failed to create document: {e}")
 
     async def get_document(self, document_id: UUID) -> Optional[DocumentBase]:
+        response = await self._get_versioned(document_id)
+        return DocumentBase(**response["_source"]) if response else None
+
+    async def get_version(self, document_id: UUID) -> Optional[DocumentVersion]:
+        """seq_no/primary_term to send back as ``if_seq_no``/``if_primary_term``."""
+        response = await self._get_versioned(document_id)
+        if not response:
+            return None
+        return DocumentVersion(
+            seq_no=response["_seq_no"], primary_term=response["_primary_term"]
+        )
+
+    async def _get_versioned(self, document_id: UUID) -> Optional[Dict[str, Any]]:
         try:
-            response = await self.client.get(index=self.index_name, id=str(document_id))
-            return DocumentBase(**response["_source"])
+            return await self.client.get(index=self.index_name, id=str(document_id))
         except NotFoundError:
             return None
+        except RequestError:
+            # a get on an alias over several indices is rejected; that only
+            # happens while reindex is moving the collection
+            return await self._get_during_reindex(document_id)
+        except (ConnectionError, ApiError) as e:
+            raise Exception(f"Failed to get document: {e}")
+
+    async def _get_during_reindex(self, document_id: UUID) -> Optional[Dict[str, Any]]:
+        """Look a document up in every index behind the alias.
+
+        The copy in the write index wins. A hit from an older index is marked
+        ``_copied: False``: it hasn't been copied over yet, so an update has
+        to write the whole document into the write index.
+        """
+        try:
+            aliases = await self.client.indices.get_alias(name=self.index_name)
+            response = await self.client.search(
+                index=self.index_name,
+                query={"ids": {"values": [str(document_id)]}},
+                seq_no_primary_term=True,
+                size=len(aliases),
+            )
         except (ConnectionError, RequestError, ApiError) as e:
             raise Exception(f"Failed to get document: {e}")
 
+        write_index = next(
+            (
+                index
+                for index, info in aliases.items()
+                if info["aliases"][self.index_name].get("is_write_index")
+            ),
+            None,
+        )
+        hits = response["hits"]["hits"]
+        for hit in hits:
+            if hit["_index"] == write_index:
+                return {**hit, "_copied": True}
+        return {**hits[0], "_copied": False} if hits else None
+
     async def update_document(
-        self, document_id: UUID, update_data: DocumentUpdate
-    ) -> DocumentBase | None:
-        current_doc = await self.get_document(document_id)
-        if not current_doc:
+        self,
+        document_id: UUID,
+        update_data: DocumentUpdate,
+        if_seq_no: Optional[int] = None,
+        if_primary_term: Optional[int] = None,
+    ) -> Optional[tuple[DocumentBase, DocumentVersion]]:
+        """Apply only the changed fields through a guarded partial update.
+
+        The write is conditional on the document's seq_no/primary_term: either
+        the ones the caller read earlier or, if none are given, the ones from
+        our own read, so concurrent editors can't silently overwrite each
+        other. A lost race raises DocumentConflictError.
+        """
+        response = await self._get_versioned(document_id)
+        if not response:
             return None
 
+        current = response["_source"]
+        version = DocumentVersion(
+            seq_no=response["_seq_no"], primary_term=response["_primary_term"]
+        )
+        if if_seq_no is not None and if_primary_term is not None:
+            # a stale version is a conflict even when the edit is a no-op
+            if (if_seq_no, if_primary_term) != (version.seq_no, version.primary_term):
+                raise DocumentConflictError(str(document_id))
+
         update_dict = update_data.model_dump(exclude_unset=True)
-        for field, value in update_dict.items():
-            setattr(current_doc, field, value)
+        changed = {
+            field: value
+            for field, value in update_dict.items()
+            if current.get(field) != value
+        }
+        if not changed:
+            return DocumentBase(**current), version
 
-        current_doc.updated_at = datetime.now()
+        changed["updated_at"] = datetime.now()
+        updated_doc = DocumentBase(**{**current, **changed})
 
         try:
-            await self.client.index(
-                index=self.index_name,
-                id=str(document_id),
-                document=current_doc.model_dump(),
-                refresh=True,
-            )
-            if self.vector_service:
-                try:
-                    await self.vector_service.upsert_document(current_doc)
-                except Exception as vector_err:
-                    logger.warning(
-                        "Vector update failed for %s: %s", document_id, vector_err
-                    )
-            return current_doc
+            script = {
+                "source": REPLACE_FIELDS_SCRIPT,
+                "params": {"fields": updated_doc.model_dump(mode="json", include=set(changed))},
+            }
+            if response.get("_copied", True):
+                result = await self.bulk_indexer.update(
+                    self.index_name,
+                    str(document_id),
+                    if_seq_no=version.seq_no,
+                    if_primary_term=version.primary_term,
+                    script=script,
+                )
+            else:
+                # mid-reindex and not copied yet: the write index gets the
+                # whole document, and the copy won't overwrite it later
+                result = await self.bulk_indexer.update(
+                    self.index_name,
+                    str(document_id),
+                    script=script,
+                    upsert=updated_doc.model_dump(mode="json"),
+                )
+        except BulkItemError as e:
+            if e.status == 409:
+                raise DocumentConflictError(str(document_id))
+            raise Exception(f"Failed to update document: {e}")
         except (NotFoundError, ConnectionError, RequestError, ApiError) as e:
             raise Exception(f"Failed to update document: {e}")
 
+        self._invalidate()
+        if self.vector_service:
+            try:
+                if "title" in changed or "content" in changed:
+                    await self.vector_service.upsert_document(updated_doc, self.collection)
+                else:
+                    await self.vector_service.update_payload(updated_doc, self.collection)
+            except Exception as vector_err:
+                logger.warning(
+                    "Vector update failed for %s: %s", document_id, vector_err
+                )
+
+        new_version = DocumentVersion(
+            seq_no=result.get("_seq_no", version.seq_no),
+            primary_term=result.get("_primary_term", version.primary_term),
+        )
+        return updated_doc, new_version
+
     async def delete_document(self, document_id: UUID) -> bool:
         try:
-            response = await self.client.delete(
-                index=self.index_name, id=str(document_id)
-            )
-            deleted = response["result"] == "deleted"
+            result = await self.bulk_indexer.delete(self.index_name, str(document_id))
+            # during a reindex the old index may still hold a copy that the
+            # running _reindex would bring back, whether or not the write
+            # index had one (e.g. upserted by an update during the copy)
+            tombstoned = await self._record_tombstone(document_id)
+            deleted = result == "deleted" or tombstoned
+            if deleted:
+                self._invalidate()
             if deleted and self.vector_service:
                 try:
                     await self.vector_service.delete_document(str(document_id))
@@ -143,9 +561,50 @@ class DocumentService:
             ):
                 return False
             raise Exception(f"Failed to delete document: {e}")
-        except (ConnectionError, ApiError) as e:
+        except (ConnectionError, ApiError, BulkItemError) as e:
             raise Exception(f"Failed to delete document: {e}")
 
+    async def _record_tombstone(self, document_id: UUID) -> bool:
+        """Remember a delete that the running reindex copy could undo."""
+        tombstones = self._tombstone_index()
+        if not await self.client.indices.exists(index=tombstones):
+            return False
+        await self.client.index(
+            index=tombstones, id=str(document_id), document={"id": str(document_id)}
+        )
+        return True
+
+    def _substring_clauses(self, query: str) -> List[Dict[str, Any]]:
+        subfield = "ngram" if len(query.strip()) >= SUBSTRING_MIN_LENGTH else "prefix"
+        return [
+            {"match": {f"{field}.{subfield}": {"query": query, "operator": "and"}}}
+            for field in ("content", "title")
+        ]
+
+    def _build_filters(self, filters: Optional[SearchFilters]) -> List[Dict[str, Any]]:
+        """Filter-context clauses: unscored and cached by Elasticsearch."""
+        if not filters:
+            return []
+        clauses: List[Dict[str, Any]] = []
+        if filters.tags:
+            clauses.append({"terms": {"tags": filters.tags}})
+        if filters.author:
+            clauses.append({"term": {"author": filters.author}})
+        for field, start, end in (
+            ("created_at", filters.created_from, filters.created_to),
+            ("updated_at", filters.updated_from, filters.updated_to),
+        ):
+            bounds = {}
+            if start:
+                bounds["gte"] = start.isoformat()
+            if end:
+                bounds["lte"] = end.isoformat()
+            if bounds:
+                clauses.append({"range": {field: bounds}})
+        if filters.deleted is not None:
+            clauses.append({"term": {"deleted": filters.deleted}})
+        return clauses
+
     def _build_es_query(self, search_query: SearchQuery) -> Dict[str, Any]:
         default_fields = ["title^3", "content^2", "author^2", "tags^2"]
         return {
@@ -161,60 +620,133 @@ class DocumentService:
                                 "type": "best_fields",
                             }
                         },
-                        {"wildcard": {"content": f"*{search_query.query}*"}},
-                        {"wildcard": {"title": f"*{search_query.query}*"}},
-                    ]
+                        *self._substring_clauses(search_query.query),
+                    ],
+                    "minimum_should_match": 1,
+                    "filter": self._build_filters(search_query.filters),
                 }
             },
             "size": search_query.size,
             "from": search_query.from_,
+            "sort": SEARCH_SORT,
+            "_source": FULL_HIT_FIELDS if search_query.full_content else HIT_FIELDS,
+            "highlight": {
+                "fields": {
+                    "content": {
+                        "fragment_size": SNIPPET_SIZE,
+                        "number_of_fragments": 1,
+                        "no_match_size": SNIPPET_SIZE,
+                    }
+                }
+            },
         }
 
+    def _hit_from_es(self, hit: Dict[str, Any]) -> SearchHit:
+        fragments = hit.get("highlight", {}).get("content")
+        return SearchHit(**hit["_source"], snippet=fragments[0] if fragments else None)
+
+    async def _open_pit(self) -> str:
+        response = await self.client.open_point_in_time(
+            index=self.index_name, keep_alive=PIT_KEEP_ALIVE
+        )
+        return response["id"]
+
+    async def _close_pit(self, pit_id: Optional[str]):
+        if not pit_id:
+            return
+        try:
+            await self.client.close_point_in_time(id=pit_id)
+        except Exception as e:
+            logger.debug("Failed to close point in time: %s", e)
+
+    async def _search_page(
+        self, body: Dict[str, Any], cursor: Optional[str]
+    ) -> tuple[Dict[str, Any], Optional[str]]:
+        """Run one page of a search_after walk; returns it with the PIT id.
+
+        The first page is a plain search sorted with an ``id`` tiebreak.
+        Follow-up pages open a point in time, so the rest of the walk sees one
+        consistent snapshot; its id travels inside the cursor.
+        """
+        if not cursor:
+            return await self.client.search(index=self.index_name, body=body), None
+
+        pit_id, search_after = decode_cursor(cursor)
+        pit_id = pit_id or await self._open_pit()
+        body = {**body, "pit": {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE}}
+        body.pop("from", None)
+        if search_after:
+            body["search_after"] = search_after
+        response = await self.client.search(body=body)
+        return response, response.get("pit_id", pit_id)
+
+    async def _next_cursor(
+        self, pit_id: Optional[str], sorts: List[List[Any]], consumed: int, more: bool
+    ) -> Optional[str]:
+        """Cursor after the ``consumed``-th hit of a page, or None at the end."""
+        if not more:
+            await self._close_pit(pit_id)
+            return None
+        return encode_cursor(pit_id, sorts[consumed - 1] if consumed else [])
+
+    async def _paged_search(
+        self, body: Dict[str, Any], cursor: Optional[str]
+    ) -> tuple[Dict[str, Any], Optional[str]]:
+        response, pit_id = await self._search_page(body, cursor)
+        hits = response["hits"]["hits"]
+        next_cursor = await self._next_cursor(
+            pit_id, [hit["sort"] for hit in hits], len(hits), len(hits) >= body["size"]
+        )
+        return response, next_cursor
+
     async def _search_elasticsearch(
         self, search_query: SearchQuery
-    ) -> tuple[int, List[DocumentResponse], int]:
+    ) -> tuple[int, List[SearchHit], int, Optional[tuple[Optional[str], List[List[Any]]]]]:
+        """ES hits plus, for cursor-capable searches, the PIT id and sort values.
+
+        The cursor itself is built by the caller once it knows how many of
+        these hits made it onto the page.
+        """
         query_body = self._build_es_query(search_query)
         try:
-            response = await self.client.search(index=self.index_name, body=query_body)
+            if search_query.cursor or not search_query.from_:
+                response, pit_id = await self._search_page(query_body, search_query.cursor)
+                page = (pit_id, [hit["sort"] for hit in response["hits"]["hits"]])
+            else:
+                response = await self.client.search(index=self.index_name, body=query_body)
+                page = None
             hits = response["hits"]["hits"]
-            results = [DocumentResponse(**hit["_source"]) for hit in hits]
+            results = [self._hit_from_es(hit) for hit in hits]
             total = response["hits"]["total"]["value"]
-            return total, results, response["took"]
+            return total, results, response["took"], page
         except (NotFoundError, ConnectionError, RequestError, ApiError) as e:
             raise Exception(f"Search failed: {e}")
 
-    async def _search_vector(self, search_query: SearchQuery) -> List[DocumentResponse]:
+    async def _search_vector(self, search_query: SearchQuery) -> List[SearchHit]:
         if not self.vector_service:
             return []
 
         try:
             hits = await self.vector_service.search(
-                search_query.query, search_query.size
+                search_query.query,
+                search_query.size,
+                payload_fields=FULL_HIT_FIELDS if search_query.full_content else HIT_FIELDS,
+                collections=[self.collection],
+                filters=search_query.filters,
             )
         except Exception as e:
             logger.warning("Vector search failed: %s", e)
             return []
 
-        results: List[DocumentResponse] = []
-        for hit in hits:
-            payload = hit.payload or {}
-            try:
-                results.append(DocumentResponse(**payload))
-            except Exception as parse_err:
-                logger.debug(
-                    "Skipping malformed vector payload for %s: %s",
-                    payload.get("id"),
-                    parse_err,
-                )
-        return results
+        return _hits_from_vector(hits)
 
     def _merge_results(
         self,
-        vector_results: List[DocumentResponse],
-        es_results: List[DocumentResponse],
+        vector_results: List[SearchHit],
+        es_results: List[SearchHit],
         limit: int,
-    ) -> List[DocumentResponse]:
-        merged: List[DocumentResponse] = []
+    ) -> List[SearchHit]:
+        merged: List[SearchHit] = []
         seen: set[str] = set()
 
         for doc in vector_results:
@@ -231,15 +763,31 @@ class DocumentService:
 
         return merged[:limit]
 
+    def _search_cache_key(self, search_query: SearchQuery) -> tuple:
+        normalized = " ".join(search_query.query.lower().split())
+        params = search_query.model_dump(exclude={"query"})
+        return normalized, orjson.dumps(params, option=orjson.OPT_SORT_KEYS)
+
     async def search_documents(self, search_query: SearchQuery) -> SearchResponse:
+        if search_query.cursor:
+            # cursor pages carry a point in time and are walked exactly once
+            return await self._search_documents(search_query)
+        return await self.search_cache.get_or_compute(
+            self._search_cache_key(search_query),
+            lambda: self._search_documents(search_query),
+        )
+
+    async def _search_documents(self, search_query: SearchQuery) -> SearchResponse:
         es_task = asyncio.create_task(self._search_elasticsearch(search_query))
+        # vector hits are only blended into the first page; cursor pages are a
+        # pure search_after walk over the Elasticsearch ranking
         vector_task = (
             asyncio.create_task(self._search_vector(search_query))
-            if self.vector_service
+            if self.vector_service and not search_query.cursor
             else None
         )
 
-        es_total, es_results, es_took = await es_task
+        es_total, es_results, es_took, page = await es_task
         vector_results = await vector_task if vector_task else []
 
         merged_results = self._merge_results(
@@ -249,24 +797,226 @@ class DocumentService:
         )
         total = max(es_total, len(vector_results), len(merged_results))
 
-        return SearchResponse(total=total, results=merged_results, took=es_took)
+        next_cursor = None
+        if page:
+            # vector hits can push ES hits off the first page; continue after
+            # the last ES hit that was actually returned so none are skipped
+            pit_id, sorts = page
+            returned = {doc.id for doc in merged_results}
+            consumed = 0
+            while consumed < len(es_results) and es_results[consumed].id in returned:
+                consumed += 1
+            more = consumed < len(es_results) or len(es_results) >= search_query.size
+            next_cursor = await self._next_cursor(pit_id, sorts, consumed, more)
+
+        return SearchResponse(
+            total=total, results=merged_results, took=es_took, next_cursor=next_cursor
+        )
 
-    async def get_all_documents(self, size: int = 100) -> List[DocumentResponse]:
-        try:
-            response = await self.client.search(
-                index=self.index_name,
-                body={
-                    "query": {"match_all": {}},
-                    "size": size,
-                    "sort": [{"created_at": {"order": "desc"}}],
-                },
+    async def facets(
+        self,
+        query: Optional[str] = None,
+        filters: Optional[SearchFilters] = None,
+        size: int = 20,
+    ) -> FacetResponse:
+        """Top ``tags`` and ``author`` values, optionally scoped to a search.
+
+        Unscoped counts are what dashboards poll, so they go through the search
+        cache and are dropped on the next write like any other cached result.
+        """
+        if query is None and filters is None:
+            return await self.search_cache.get_or_compute(
+                ("facets", size), lambda: self._facets(query, filters, size)
             )
+        return await self._facets(query, filters, size)
+
+    async def _facets(
+        self, query: Optional[str], filters: Optional[SearchFilters], size: int
+    ) -> FacetResponse:
+        if query is not None:
+            es_query = self._build_es_query(
+                SearchQuery(query=query, size=0, from_=0, filters=filters)
+            )["query"]
+        elif filters is not None:
+            es_query = {"bool": {"filter": self._build_filters(filters)}}
+        else:
+            es_query = {"match_all": {}}
+
+        body = {
+            "query": es_query,
+            "size": 0,
+            "track_total_hits": True,
+            "aggs": {
+                field: {"terms": {"field": field, "size": size}}
+                for field in FACET_FIELDS
+            },
+        }
+        try:
+            response = await self.client.search(index=self.index_name, body=body)
+        except (NotFoundError, ConnectionError, RequestError, ApiError) as e:
+            raise Exception(f"Failed to compute facets: {e}")
+
+        return FacetResponse(
+            total=response["hits"]["total"]["value"],
+            facets={
+                field: [
+                    FacetBucket(key=bucket["key"], count=bucket["doc_count"])
+                    for bucket in response["aggregations"][field]["buckets"]
+                ]
+                for field in FACET_FIELDS
+            },
+            took=response["took"],
+        )
+
+    async def get_all_documents(
+        self, size: int = 100, cursor: Optional[str] = None
+    ) -> tuple[List[DocumentResponse], Optional[str]]:
+        body = {"query": {"match_all": {}}, "size": size, "sort": LISTING_SORT}
+        try:
+            response, next_cursor = await self._paged_search(body, cursor)
             hits = response["hits"]["hits"]
             results = [DocumentResponse(**hit["_source"]) for hit in hits]
 
-            return results
+            return results, next_cursor
         except (NotFoundError, ConnectionError, RequestError, ApiError) as e:
             raise Exception(f"Failed to get all documents: {e}")
 
+    async def iter_all_documents(self, page_size: int = 500) -> AsyncIterator[DocumentResponse]:
+        """Walk the whole index at constant per-page cost, e.g. for exports."""
+        pit_id = await self._open_pit()
+        search_after: List[Any] = []
+        try:
+            while True:
+                body = {
+                    "query": {"match_all": {}},
+                    "size": page_size,
+                    "sort": LISTING_SORT,
+                    "pit": {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE},
+                }
+                if search_after:
+                    body["search_after"] = search_after
+                response = await self.client.search(body=body)
+                pit_id = response.get("pit_id", pit_id)
+                hits = response["hits"]["hits"]
+                for hit in hits:
+                    yield DocumentResponse(**hit["_source"])
+                if len(hits) < page_size:
+                    return
+                search_after = hits[-1]["sort"]
+        except (NotFoundError, ConnectionError, RequestError, ApiError) as e:
+            raise Exception(f"Failed to export documents: {e}")
+        finally:
+            await self._close_pit(pit_id)
+
+
+    async def index_documents(self, documents: List[DocumentBase]) -> int:
+        """Write documents that only exist in immudb, e.g. when backfilling."""
+        live = [document for document in documents if not document.deleted]
+        try:
+            await asyncio.gather(
+                *(
+                    self.bulk_indexer.index(self.index_name, document.id, document.model_dump())
+                    for document in live
+                )
+            )
+        except (NotFoundError, ConnectionError, RequestError, ApiError, BulkItemError) as e:
+            raise Exception(f"Failed to index documents: {e}")
+        if self.vector_service:
+            results = await asyncio.gather(
+                *(self.vector_service.upsert_document(document, self.collection) for document in live),
+                return_exceptions=True,
+            )
+            for document, result in zip(live, results):
+                if isinstance(result, Exception):
+                    logger.warning("Vector upsert failed for %s: %s", document.id, result)
+        return len(live)
+
+    async def reembed_all(self, concurrency: int = 32) -> int:
+        """Rewrite every document's vectors, e.g. after the chunking changed."""
+        if not self.vector_service:
+            return 0
+        count = 0
+        pending: List[Any] = []
+        async for doc in self.iter_all_documents():
+            # only live documents are kept in the search index
+            document = DocumentBase(**doc.model_dump(), deleted=False)
+            pending.append(self.vector_service.upsert_document(document, self.collection))
+            if len(pending) >= concurrency:
+                await asyncio.gather(*pending)
+                count, pending = count + len(pending), []
+        await asyncio.gather(*pending)
+        return count + len(pending)
+
+document_service = DocumentService("documents", settings.documents_index)
+news_service = DocumentService("news", settings.news_index)
+learn_service = DocumentService("learn", settings.learn_index)
+
+collection_services: Dict[str, DocumentService] = {
+    service.collection: service
+    for service in (document_service, news_service, learn_service)
+}
+
+
+async def multi_search(
+    search_query: SearchQuery, collections: List[str]
+) -> MultiSearchResponse:
+    """Search several collections with one ``_msearch`` plus the vector search.
+
+    The query is embedded once; the grouped vector search then runs one
+    concurrent Qdrant request per collection (see ``VectorService.search_many``).
+    """
+    services = [collection_services[name] for name in dict.fromkeys(collections)]
+    searches: List[Dict[str, Any]] = []
+    for service in services:
+        searches.append({"index": service.index_name})
+        searches.append(service._build_es_query(search_query))
+
+    client = es_client.get_async_client()
+    es_task = asyncio.create_task(client.msearch(searches=searches))
+    vector_task = (
+        asyncio.create_task(
+            vector_service.search_many(
+                search_query.query,
+                search_query.size,
+                payload_fields=FULL_HIT_FIELDS if search_query.full_content else HIT_FIELDS,
+                collections=[service.collection for service in services],
+                filters=search_query.filters,
+            )
+        )
+        if settings.vector_search_enabled
+        else None
+    )
+
+    try:
+        es_response = await es_task
+    except (NotFoundError, ConnectionError, RequestError, ApiError) as e:
+        if vector_task:
+            vector_task.cancel()
+        raise Exception(f"Search failed: {e}")
+
+    vector_hits: Dict[str, list] = {}
+    if vector_task:
+        try:
+            vector_hits = await vector_task
+        except Exception as e:
+            logger.warning("Vector search failed: %s", e)
+
+    results: Dict[str, SearchResponse] = {}
+    for service, response in zip(services, es_response["responses"]):
+        if "error" in response:
+            logger.warning("Search on %s failed: %s", service.index_name, response["error"])
+            es_results, es_total, es_took = [], 0, 0
+        else:
+            es_results = [service._hit_from_es(hit) for hit in response["hits"]["hits"]]
+            es_total = response["hits"]["total"]["value"]
+            es_took = response["took"]
+
+        vector_results = _hits_from_vector(vector_hits.get(service.collection, []))
+        merged = service._merge_results(vector_results, es_results, search_query.size)
+        results[service.collection] = SearchResponse(
+            total=max(es_total, len(vector_results), len(merged)),
+            results=merged,
+            took=es_took,
+        )
 
-document_service = DocumentService()
+    return MultiSearchResponse(results=results, took=es_response.get("took", 0))
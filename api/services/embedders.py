@@ -0,0 +1,96 @@
+import copy
+import threading
+from typing import TYPE_CHECKING, List, Optional
+
+if TYPE_CHECKING:
+    # imported lazily: it pulls in torch, which API processes that hand
+    # inference to the embedding worker never need
+    from sentence_transformers import SentenceTransformer
+
+EMBEDDING_BACKENDS = ("torch", "onnx", "onnx-int8")
+# quantized export shipped in the sentence-transformers model repos; other
+# models can produce one with export_dynamic_quantized_onnx_model
+DEFAULT_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+
+def load_embedder(
+    model_name: str,
+    backend: str = "torch",
+    onnx_file_name: Optional[str] = None,
+    threads: int = 0,
+) -> "SentenceTransformer":
+    """Load ``model_name`` on the given backend.
+
+    ``threads`` caps intra-op parallelism (0 keeps the library default).
+    PyTorch takes it process-wide; ONNX Runtime ignores that setting and
+    needs it on the session options instead.
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend: {backend}")
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        if threads:
+            import torch
+
+            torch.set_num_threads(threads)
+        return SentenceTransformer(model_name)
+
+    model_kwargs = {}
+    file_name = onnx_file_name or (DEFAULT_INT8_FILE if backend == "onnx-int8" else None)
+    if file_name:
+        model_kwargs["file_name"] = file_name
+    if threads:
+        import onnxruntime
+
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = threads
+        model_kwargs["session_options"] = session_options
+    return SentenceTransformer(model_name, backend="onnx", model_kwargs=model_kwargs or None)
+
+
+def embedder_id(model_name: str, backend: str, onnx_file_name: Optional[str] = None) -> str:
+    """Names the vectors an embedder produces; quantized backends differ slightly."""
+    return ":".join(filter(None, (model_name, backend, onnx_file_name)))
+
+
+class PassageSplitter:
+    """Cuts text into overlapping windows the model embeds without truncation.
+
+    Windows are counted in the model's own tokens, against ``max_seq_length``
+    minus the title, the separator and the special tokens, because every
+    passage is embedded as ``title + "\n" + passage``. Text the tokenizer
+    splits finely (e.g. non-English text on an English model) gets shorter
+    passages instead of a cut-off tail. Passages are slices of the original
+    text.
+    """
+
+    def __init__(self, model: "SentenceTransformer", overlap: int):
+        # a private copy: encode() reconfigures the model's tokenizer for
+        # truncation and padding on every call, and a fast tokenizer can't
+        # be used from another thread while that happens
+        self.tokenizer = copy.deepcopy(model.tokenizer)
+        self.max_tokens = model.max_seq_length
+        self.overlap = overlap
+        self._lock = threading.Lock()
+
+    def split(self, title: str, text: str) -> List[str]:
+        """Always returns at least one passage."""
+        with self._lock:
+            reserved = len(self.tokenizer.tokenize(f"{title}\n")) + self.tokenizer.num_special_tokens_to_add()
+            offsets = self.tokenizer(
+                text, add_special_tokens=False, return_offsets_mapping=True, verbose=False
+            )["offset_mapping"]
+
+        # a title longer than the model limit would leave no room at all
+        window = max(self.max_tokens - reserved, self.overlap + 1)
+        if len(offsets) <= window:
+            return [text.strip()]
+        step = window - self.overlap
+        passages = []
+        for start in range(0, len(offsets), step):
+            end = min(start + window, len(offsets))
+            passages.append(text[offsets[start][0]:offsets[end - 1][1]])
+            if end == len(offsets):
+                break
+        return passages
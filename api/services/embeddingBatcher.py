@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """Collects concurrent embedding requests into micro-batches.
+
+    A single worker task takes the first queued text, then keeps collecting
+    until it has ``max_batch_size`` texts or ``max_wait_ms`` have passed. The
+    whole batch goes through one ``encode`` call in a worker thread, and each
+    caller gets its own vector back. Batches run one at a time; texts that
+    arrive while a batch is encoding are picked up by the next one.
+    """
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int,
+        max_wait_ms: float,
+    ):
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._stats = {"batches": 0, "items": 0, "errors": 0}
+        # batch size -> [batches, encode seconds, queue wait seconds]
+        self._by_size: Dict[int, List[float]] = {}
+
+    async def embed(self, text: str) -> List[float]:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        self._queue.put_nowait((text, future, time.monotonic()))
+        return await future
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        return list(await asyncio.gather(*(self.embed(text) for text in texts)))
+
+    async def _collect(self) -> List[Tuple[str, asyncio.Future, float]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            # callers that gave up (e.g. a cancelled request) are not encoded
+            batch = [item for item in batch if not item[1].done()]
+            if not batch:
+                continue
+
+            started = time.monotonic()
+            try:
+                vectors = await asyncio.to_thread(self.encode, [text for text, _, _ in batch])
+            except Exception as e:
+                logger.warning("Embedding batch of %d failed: %s", len(batch), e)
+                self._stats["errors"] += len(batch)
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self._record(batch, started, time.monotonic())
+            for (_, future, _), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+    def _record(self, batch, started: float, finished: float):
+        size = len(batch)
+        self._stats["batches"] += 1
+        self._stats["items"] += size
+        entry = self._by_size.setdefault(size, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += finished - started
+        entry[2] += sum(started - queued_at for _, _, queued_at in batch) / size
+
+    async def close(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    def stats(self) -> dict:
+        by_size = {}
+        for size, (batches, encode_seconds, wait_seconds) in sorted(self._by_size.items()):
+            by_size[str(size)] = {
+                "batches": batches,
+                "encode_ms_avg": round(encode_seconds / batches * 1000, 3),
+                "queue_wait_ms_avg": round(wait_seconds / batches * 1000, 3),
+                "texts_per_second": round(size * batches / encode_seconds, 1) if encode_seconds else None,
+            }
+        return {
+            **self._stats,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "by_batch_size": by_size,
+        }
@@ -0,0 +1,157 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+# disk hits whose recency is written with the next insert; a read alone
+# never costs a commit
+MAX_PENDING_TOUCHES = 1024
+
+
+class EmbeddingCache:
+    """Content-addressed cache of embedding vectors.
+
+    Keys are ``sha256(model name + text)``, so a model change never serves
+    stale vectors. Vectors are kept as packed float32 in an in-memory LRU and,
+    if ``path`` is set, in a SQLite file shared across restarts and workers.
+    The disk tier is best effort: an error there (e.g. "database is locked"
+    under several writers) is logged and counts as a miss.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        max_entries: int,
+        path: Optional[str] = None,
+        max_disk_entries: int = 1_000_000,
+    ):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self._entries: OrderedDict[bytes, bytes] = OrderedDict()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_lock = threading.Lock()
+        self._touched: OrderedDict[bytes, bytes] = OrderedDict()
+        self._stats = {
+            "hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "disk_evictions": 0,
+            "disk_errors": 0,
+        }
+
+    def key(self, text: str) -> bytes:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode()).digest()
+
+    async def get(self, text: str) -> Optional[List[float]]:
+        key = self.key(text)
+        packed = self._entries.get(key)
+        if packed is not None:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return _unpack(packed)
+
+        if self.path:
+            try:
+                packed = await asyncio.to_thread(self._disk_get, key)
+            except sqlite3.Error as e:
+                self._stats["disk_errors"] += 1
+                logger.warning("Embedding cache read failed: %s", e)
+                packed = None
+            if packed is not None:
+                self._remember(key, packed)
+                self._stats["disk_hits"] += 1
+                return _unpack(packed)
+
+        self._stats["misses"] += 1
+        return None
+
+    async def set(self, text: str, vector: List[float]):
+        key = self.key(text)
+        packed = array("f", vector).tobytes()
+        self._remember(key, packed)
+        if self.path:
+            try:
+                await asyncio.to_thread(self._disk_set, key, packed)
+            except sqlite3.Error as e:
+                self._stats["disk_errors"] += 1
+                logger.warning("Embedding cache write failed: %s", e)
+
+    def _remember(self, key: bytes, packed: bytes):
+        self._entries[key] = packed
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+        return self._db
+
+    def _disk_get(self, key: bytes) -> Optional[bytes]:
+        with self._db_lock:
+            db = self._connection()
+            row = db.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+            if row:
+                # re-inserting gives the row the newest rowid, which keeps
+                # rowid order equal to recency for eviction; deferred to the
+                # next write so that hits stay read-only
+                self._touched[key] = row[0]
+                self._touched.move_to_end(key)
+                while len(self._touched) > MAX_PENDING_TOUCHES:
+                    self._touched.popitem(last=False)
+        return row[0] if row else None
+
+    def _disk_set(self, key: bytes, packed: bytes):
+        with self._db_lock:
+            self._touched.pop(key, None)
+            self._disk_write(self._connection(), [*self._touched.items(), (key, packed)])
+            self._touched.clear()
+
+    def _disk_write(self, db: sqlite3.Connection, rows: List[tuple]):
+        try:
+            db.executemany("INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)", rows)
+            # rowids only grow, so everything more than max_disk_entries below
+            # the newest one is least recently used; a range delete on the
+            # rowid b-tree, no count(*) needed
+            evicted = db.execute(
+                "DELETE FROM embeddings WHERE rowid <= (SELECT max(rowid) FROM embeddings) - ?",
+                (self.max_disk_entries,),
+            ).rowcount
+            db.commit()
+        except sqlite3.Error:
+            db.rollback()
+            raise
+        self._stats["disk_evictions"] += max(evicted, 0)
+
+    def close(self):
+        with self._db_lock:
+            if self._db is not None:
+                if self._touched:
+                    try:
+                        self._disk_write(self._db, list(self._touched.items()))
+                    except sqlite3.Error as e:
+                        logger.warning("Embedding cache flush failed: %s", e)
+                    self._touched.clear()
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> dict:
+        return {**self._stats, "entries": len(self._entries)}
+
+
+def _unpack(packed: bytes) -> List[float]:
+    return array("f", packed).tolist()
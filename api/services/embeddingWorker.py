@@ -0,0 +1,184 @@
+"""Embedding sidecar shared by every API process on a host.
+
+Run with ``python -m services.embeddingWorker``. The worker loads the model
+once and serves it over a Unix socket. Requests from all connections go
+through one EmbeddingBatcher, so API workers also batch with each other.
+API processes use it when ``EMBEDDING_WORKER_SOCKET`` is set.
+
+Frames are a 4-byte big-endian length followed by a msgpack map. A request
+is ``{"texts": [...]}``, ``{"op": "split", "title": ..., "text": ...}`` or
+``{"op": "info"}``. Vectors come back as packed float32 so large batches are
+not serialized as floats.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import socket
+import struct
+import threading
+from array import array
+from typing import List, Optional
+
+import msgpack
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+HEADER = struct.Struct(">I")
+
+
+def _pack(obj) -> bytes:
+    body = msgpack.packb(obj, use_bin_type=True)
+    return HEADER.pack(len(body)) + body
+
+
+class WorkerUnavailableError(Exception):
+    pass
+
+
+class EmbeddingWorkerClient:
+    """Blocking client; used from the batcher's worker thread."""
+
+    def __init__(self, socket_path: str, timeout: float):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> socket.socket:
+        if self._sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._sock = sock
+        return self._sock
+
+    def _recv_exact(self, sock: socket.socket, size: int) -> bytes:
+        chunks = bytearray()
+        while len(chunks) < size:
+            chunk = sock.recv(size - len(chunks))
+            if not chunk:
+                raise ConnectionError("embedding worker closed the connection")
+            chunks.extend(chunk)
+        return bytes(chunks)
+
+    def _call(self, request: dict) -> dict:
+        with self._lock:
+            try:
+                sock = self._connect()
+                sock.sendall(_pack(request))
+                (size,) = HEADER.unpack(self._recv_exact(sock, HEADER.size))
+                response = msgpack.unpackb(self._recv_exact(sock, size), raw=False)
+            except OSError as e:
+                self.close()
+                raise WorkerUnavailableError(f"Embedding worker unavailable: {e}")
+        if "error" in response:
+            raise Exception(f"Embedding worker failed: {response['error']}")
+        return response
+
+    def encode(self, texts: List[str]) -> List[List[float]]:
+        response = self._call({"texts": texts})
+        dimension = response["dimension"]
+        flat = array("f", response["vectors"])
+        return [flat[i:i + dimension].tolist() for i in range(0, len(flat), dimension)]
+
+    def split(self, title: str, text: str) -> List[str]:
+        return self._call({"op": "split", "title": title, "text": text})["passages"]
+
+    def info(self) -> dict:
+        return self._call({"op": "info"})
+
+    def dimension(self) -> int:
+        return self.info()["dimension"]
+
+    def close(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            finally:
+                self._sock = None
+
+
+class EmbeddingWorker:
+    def __init__(self, socket_path: str, threads: int):
+        from services.embeddingBatcher import EmbeddingBatcher
+        from services.embedders import PassageSplitter, embedder_id, load_embedder
+
+        self.socket_path = socket_path
+        self.model = load_embedder(
+            settings.vector_model_name,
+            settings.embedding_backend,
+            settings.embedding_onnx_file_name,
+            threads=threads,
+        )
+        self.dimension = self.model.get_sentence_embedding_dimension()
+        self.embedder = embedder_id(
+            settings.vector_model_name,
+            settings.embedding_backend,
+            settings.embedding_onnx_file_name,
+        )
+        self.splitter = PassageSplitter(self.model, settings.vector_passage_overlap_tokens)
+        self.batcher = EmbeddingBatcher(
+            self._encode,
+            max_batch_size=settings.embedding_batch_max_size,
+            max_wait_ms=settings.embedding_batch_max_wait_ms,
+        )
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        return self.model.encode(texts, batch_size=len(texts)).tolist()
+
+    async def _handle(self, request: dict) -> dict:
+        if request.get("op") == "info":
+            return {
+                "dimension": self.dimension,
+                "model": settings.vector_model_name,
+                "embedder": self.embedder,
+            }
+        if request.get("op") == "split":
+            passages = await asyncio.to_thread(self.splitter.split, request["title"], request["text"])
+            return {"passages": passages}
+        vectors = await self.batcher.embed_many(request["texts"])
+        flat = array("f", (value for vector in vectors for value in vector))
+        return {"dimension": self.dimension, "vectors": flat.tobytes()}
+
+    async def _serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    (size,) = HEADER.unpack(await reader.readexactly(HEADER.size))
+                    request = msgpack.unpackb(await reader.readexactly(size), raw=False)
+                except asyncio.IncompleteReadError:
+                    return
+                try:
+                    response = await self._handle(request)
+                except Exception as e:
+                    logger.warning("Embedding request failed: %s", e)
+                    response = {"error": str(e)}
+                writer.write(_pack(response))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self):
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        server = await asyncio.start_unix_server(self._serve_connection, path=self.socket_path)
+        logger.info("Embedding worker listening on %s (dimension %d)", self.socket_path, self.dimension)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve sentence embeddings over a Unix socket.")
+    parser.add_argument("--socket", default=settings.embedding_worker_socket or "/tmp/embeddings.sock")
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=settings.embedding_worker_threads,
+        help="intra-op threads for inference (0 keeps the library default)",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(EmbeddingWorker(args.socket, args.threads).serve())
@@ -0,0 +1,73 @@
+import asyncio
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class ResultCache:
+    """In-process TTL/LRU cache for computed search results.
+
+    Concurrent callers asking for the same key share one in-flight
+    computation. It runs in its own task, so a caller that is cancelled only
+    stops waiting; the others still get the result. ``bump()`` invalidates
+    everything cached so far; results of computations that were already
+    running when it was called are returned to their callers but not stored.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[tuple[int, Hashable], asyncio.Task] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0}
+
+    def bump(self):
+        self.generation += 1
+        self._entries.clear()
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        item = self._entries.get(key)
+        if item is not None:
+            expires_at, value = item
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return value
+            del self._entries[key]
+
+        flight_key = (self.generation, key)
+        task = self._inflight.get(flight_key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            task = asyncio.get_running_loop().create_task(
+                self._compute(key, self.generation, compute)
+            )
+            self._inflight[flight_key] = task
+            task.add_done_callback(partial(self._finish, flight_key))
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: Hashable, generation: int, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = await compute()
+        if generation == self.generation:
+            self._store(key, value)
+        return value
+
+    def _finish(self, flight_key: tuple[int, Hashable], task: asyncio.Task):
+        self._inflight.pop(flight_key, None)
+        if not task.cancelled():
+            # every caller may have given up; don't let asyncio log it as unretrieved
+            task.exception()
+
+    def _store(self, key: Hashable, value: Any):
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def stats(self) -> dict:
+        return {**self._stats, "entries": len(self._entries), "generation": self.generation}
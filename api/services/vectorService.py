@@ -1,12 +1,46 @@
 import asyncio
-from typing import List
+import uuid
+from typing import TYPE_CHECKING, Dict, List, Optional
 
-from sentence_transformers import SentenceTransformer
 from qdrant_client import AsyncQdrantClient
 from qdrant_client.http import models as qmodels
 
 from core.config import settings
-from schemas.documents import DocumentBase
+from schemas.documents import DocumentBase, SearchFilters
+from services.embeddingBatcher import EmbeddingBatcher
+from services.embeddingCache import EmbeddingCache
+from services.embedders import PassageSplitter, embedder_id, load_embedder
+from services.embeddingWorker import EmbeddingWorkerClient
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+# payload fields used in search filters; indexed so Qdrant can filter
+# during the HNSW walk instead of over-fetching and post-filtering
+PAYLOAD_INDEXES = {
+    "collection": qmodels.PayloadSchemaType.KEYWORD,
+    "tags": qmodels.PayloadSchemaType.KEYWORD,
+    "author": qmodels.PayloadSchemaType.KEYWORD,
+    "deleted": qmodels.PayloadSchemaType.BOOL,
+    "created_at": qmodels.PayloadSchemaType.DATETIME,
+    "updated_at": qmodels.PayloadSchemaType.DATETIME,
+    "parent_id": qmodels.PayloadSchemaType.KEYWORD,
+    "passage": qmodels.PayloadSchemaType.INTEGER,
+}
+
+# copied onto every passage so filters see all of a document's passages
+FILTER_FIELDS = ("collection", "tags", "author", "deleted", "created_at", "updated_at")
+
+
+def passage_point_id(document_id: str, index: int) -> str:
+    if index == 0:
+        return document_id
+    return str(uuid.uuid5(uuid.UUID(document_id), str(index)))
+
+
+def _parent_condition(document_id: str) -> qmodels.FieldCondition:
+    return qmodels.FieldCondition(key="parent_id", match=qmodels.MatchValue(value=document_id))
 
 
 class VectorService:
@@ -18,25 +52,88 @@ class VectorService:
         )
         # Lazy initialization of embedder
         self._embedder = None
+        self._splitter = None
         self._vector_size = None
         self._collection_ready = False
         self._collection_lock = asyncio.Lock()
-        self._embedder_lock = asyncio.Lock()
+        self._cache_lock = asyncio.Lock()
+        self.worker = (
+            EmbeddingWorkerClient(
+                settings.embedding_worker_socket,
+                timeout=settings.embedding_worker_timeout_seconds,
+            )
+            if settings.embedding_worker_socket
+            else None
+        )
+        self.batcher = EmbeddingBatcher(
+            self._encode_batch,
+            max_batch_size=settings.embedding_batch_max_size,
+            max_wait_ms=settings.embedding_batch_max_wait_ms,
+        )
+        self.embedding_cache: Optional[EmbeddingCache] = None
 
-    def _get_embedder(self) -> SentenceTransformer:
-        """Lazy load the embedding model."""
+    def _get_embedder(self) -> "SentenceTransformer":
+        """Lazy load the embedding model (and torch with it)."""
         if self._embedder is None:
-            self._embedder = SentenceTransformer(settings.vector_model_name)
+            self._embedder = load_embedder(
+                settings.vector_model_name,
+                settings.embedding_backend,
+                settings.embedding_onnx_file_name,
+            )
             self._vector_size = self._embedder.get_sentence_embedding_dimension()
         return self._embedder
 
-    @property
-    def vector_size(self) -> int:
-        """Get vector size, initializing embedder if needed."""
+    def _split(self, title: str, content: str) -> List[str]:
+        # runs in a worker thread; needs the model's tokenizer, so it happens
+        # wherever the model lives
+        if self.worker:
+            return self.worker.split(title, content)
+        if self._splitter is None:
+            self._splitter = PassageSplitter(
+                self._get_embedder(), settings.vector_passage_overlap_tokens
+            )
+        return self._splitter.split(title, content)
+
+    async def get_vector_size(self) -> int:
+        """Get vector size, initializing embedder if needed.
+
+        Both the worker round trip and loading the model block, so they run
+        in a thread instead of stalling the event loop.
+        """
         if self._vector_size is None:
-            self._get_embedder()
+            if self.worker:
+                self._vector_size = await asyncio.to_thread(self.worker.dimension)
+            else:
+                await asyncio.to_thread(self._get_embedder)
         return self._vector_size
 
+    async def _get_embedding_cache(self) -> EmbeddingCache:
+        """Cache keyed by whoever computes the vectors.
+
+        With an embedding worker configured that is the worker's model and
+        backend, which the worker reports, not this process's settings.
+        """
+        if self.embedding_cache is None:
+            async with self._cache_lock:
+                if self.embedding_cache is None:
+                    if self.worker:
+                        info = await asyncio.to_thread(self.worker.info)
+                        self._vector_size = info["dimension"]
+                        identity = info["embedder"]
+                    else:
+                        identity = embedder_id(
+                            settings.vector_model_name,
+                            settings.embedding_backend,
+                            settings.embedding_onnx_file_name,
+                        )
+                    self.embedding_cache = EmbeddingCache(
+                        identity,
+                        max_entries=settings.embedding_cache_max_entries,
+                        path=settings.embedding_cache_path,
+                        max_disk_entries=settings.embedding_cache_disk_max_entries,
+                    )
+        return self.embedding_cache
+
     async def _ensure_collection(self) -> None:
         if self._collection_ready:
             return
@@ -50,48 +147,231 @@ class VectorService:
                 await self.client.recreate_collection(
                     collection_name=self.collection_name,
                     vectors_config=qmodels.VectorParams(
-                        size=self.vector_size,
+                        size=await self.get_vector_size(),
                         distance=qmodels.Distance.COSINE,
                     ),
                 )
+            for field_name, field_schema in PAYLOAD_INDEXES.items():
+                await self.client.create_payload_index(
+                    collection_name=self.collection_name,
+                    field_name=field_name,
+                    field_schema=field_schema,
+                )
             self._collection_ready = True
 
-    async def _embed(self, text: str) -> List[float]:
-        # SentenceTransformer encode is synchronous; run in a worker thread
+    def _encode_batch(self, texts: List[str]) -> List[List[float]]:
+        # runs in a worker thread; one encode call for the whole micro-batch
+        if self.worker:
+            return self.worker.encode(texts)
         embedder = self._get_embedder()
-        return await asyncio.to_thread(lambda: embedder.encode(text).tolist())
+        return embedder.encode(texts, batch_size=len(texts)).tolist()
+
+    async def _embed(self, text: str) -> List[float]:
+        # unchanged document text and repeated queries skip the model entirely
+        cache = await self._get_embedding_cache()
+        vector = await cache.get(text)
+        if vector is None:
+            vector = await self.batcher.embed(text)
+            await cache.set(text, vector)
+        return vector
+
+    def _build_filter(
+        self, collections: Optional[List[str]], filters: Optional[SearchFilters]
+    ) -> Optional[qmodels.Filter]:
+        must: List[qmodels.Condition] = []
+
+        if collections:
+            partition: List[qmodels.Condition] = [
+                qmodels.FieldCondition(key="collection", match=qmodels.MatchAny(any=collections))
+            ]
+            if "documents" in collections:
+                # points written before collections were partitioned have no tag
+                partition.append(
+                    qmodels.IsEmptyCondition(is_empty=qmodels.PayloadField(key="collection"))
+                )
+            must.append(qmodels.Filter(should=partition))
+
+        if filters:
+            if filters.tags:
+                must.append(qmodels.FieldCondition(key="tags", match=qmodels.MatchAny(any=filters.tags)))
+            if filters.author:
+                must.append(qmodels.FieldCondition(key="author", match=qmodels.MatchValue(value=filters.author)))
+            for key, start, end in (
+                ("created_at", filters.created_from, filters.created_to),
+                ("updated_at", filters.updated_from, filters.updated_to),
+            ):
+                if start or end:
+                    must.append(qmodels.FieldCondition(key=key, range=qmodels.DatetimeRange(gte=start, lte=end)))
+            if filters.deleted is not None:
+                must.append(qmodels.FieldCondition(key="deleted", match=qmodels.MatchValue(value=filters.deleted)))
+
+        return qmodels.Filter(must=must) if must else None
+
+    def _passage_points(
+        self, document: DocumentBase, collection: str, vectors: List[List[float]], passages: List[str]
+    ) -> List[qmodels.PointStruct]:
+        payload = {**document.model_dump(mode="json"), "collection": collection}
+        filter_payload = {key: payload[key] for key in FILTER_FIELDS}
+        points = []
+        for index, (vector, passage) in enumerate(zip(vectors, passages)):
+            # the first passage carries the whole document and keeps the
+            # document's own id, so it doubles as the group lookup record
+            base = payload if index == 0 else filter_payload
+            points.append(
+                qmodels.PointStruct(
+                    id=passage_point_id(document.id, index),
+                    vector=vector,
+                    payload={**base, "parent_id": document.id, "passage": index, "text": passage},
+                )
+            )
+        return points
 
-    async def upsert_document(self, document: DocumentBase) -> None:
+    async def upsert_document(self, document: DocumentBase, collection: str = "documents") -> None:
         await self._ensure_collection()
-        vector = await self._embed(f"{document.title}\n{document.content}")
-        payload = document.model_dump(mode="json")
+        passages = await asyncio.to_thread(self._split, document.title, document.content)
+        vectors = await asyncio.gather(
+            *(self._embed(f"{document.title}\n{passage}") for passage in passages)
+        )
         await self.client.upsert(
             collection_name=self.collection_name,
-            points=[
-                qmodels.PointStruct(
-                    id=document.id,
-                    vector=vector,
-                    payload=payload,
+            points=self._passage_points(document, collection, vectors, passages),
+        )
+        # drop passages left over from a longer previous version
+        await self.client.delete(
+            collection_name=self.collection_name,
+            points_selector=qmodels.FilterSelector(
+                filter=qmodels.Filter(
+                    must=[
+                        _parent_condition(document.id),
+                        qmodels.FieldCondition(key="passage", range=qmodels.Range(gte=len(passages))),
+                    ]
                 )
-            ],
+            ),
+        )
+
+    async def update_payload(self, document: DocumentBase, collection: str = "documents") -> None:
+        """Refresh the stored payload without re-embedding; for non-text edits."""
+        await self._ensure_collection()
+        payload = {**document.model_dump(mode="json"), "collection": collection}
+        await self.client.set_payload(
+            collection_name=self.collection_name,
+            payload={key: payload[key] for key in FILTER_FIELDS},
+            points=qmodels.FilterSelector(filter=qmodels.Filter(must=[_parent_condition(document.id)])),
+        )
+        await self.client.set_payload(
+            collection_name=self.collection_name,
+            payload=payload,
+            points=[document.id],
         )
 
     async def delete_document(self, document_id: str) -> None:
         await self._ensure_collection()
         await self.client.delete(
             collection_name=self.collection_name,
-            points_selector=qmodels.PointIdsList(points=[document_id]),
+            points_selector=qmodels.FilterSelector(
+                filter=qmodels.Filter(
+                    should=[
+                        _parent_condition(document_id),
+                        # single-vector point written before chunking
+                        qmodels.HasIdCondition(has_id=[document_id]),
+                    ]
+                )
+            ),
         )
 
-    async def search(self, query: str, limit: int) -> list[qmodels.ScoredPoint]:
-        await self._ensure_collection()
-        vector = await self._embed(query)
-        return await self.client.search(
+    async def _search_groups(
+        self,
+        vector: List[float],
+        limit: int,
+        payload_fields: Optional[List[str]],
+        query_filter: Optional[qmodels.Filter],
+    ) -> list[qmodels.ScoredPoint]:
+        """Best passage per document, returned as one point per document."""
+        response = await self.client.search_groups(
             collection_name=self.collection_name,
             query_vector=vector,
+            group_by="parent_id",
+            group_size=1,
             limit=limit,
-            with_payload=True,
+            query_filter=query_filter,
+            with_payload=["text"],
+            with_lookup=qmodels.WithLookup(
+                collection=self.collection_name,
+                with_payload=payload_fields if payload_fields is not None else True,
+                with_vectors=False,
+            ),
+        )
+        points: list[qmodels.ScoredPoint] = []
+        for group in response.groups:
+            if not group.hits or group.lookup is None:
+                continue
+            best = group.hits[0]
+            points.append(
+                qmodels.ScoredPoint(
+                    id=group.lookup.id,
+                    version=best.version,
+                    score=best.score,
+                    payload={**(group.lookup.payload or {}), "snippet": (best.payload or {}).get("text")},
+                )
+            )
+        return points
+
+    async def search(
+        self,
+        query: str,
+        limit: int,
+        payload_fields: Optional[List[str]] = None,
+        collections: Optional[List[str]] = None,
+        filters: Optional[SearchFilters] = None,
+    ) -> list[qmodels.ScoredPoint]:
+        await self._ensure_collection()
+        vector = await self._embed(query)
+        return await self._search_groups(
+            vector, limit, payload_fields, self._build_filter(collections, filters)
+        )
+
+    async def search_many(
+        self,
+        query: str,
+        limit: int,
+        payload_fields: Optional[List[str]],
+        collections: List[str],
+        filters: Optional[SearchFilters] = None,
+    ) -> Dict[str, list[qmodels.ScoredPoint]]:
+        """Top ``limit`` documents per collection from one query embedding.
+
+        Qdrant has no batched form of grouped search, so this sends one
+        concurrent ``search_groups`` request per collection instead of a single
+        ``search_batch``. Collapsing an over-fetched batch by ``parent_id`` on
+        our side could return fewer than ``limit`` documents when one long
+        document fills the window, so the extra round trips are the price of
+        correct per-document results.
+        """
+        await self._ensure_collection()
+        vector = await self._embed(query)
+        responses = await asyncio.gather(
+            *(
+                self._search_groups(
+                    vector, limit, payload_fields, self._build_filter([collection], filters)
+                )
+                for collection in collections
+            )
         )
+        return dict(zip(collections, responses))
+
+    def stats(self) -> dict:
+        return {
+            "embedding_batches": self.batcher.stats(),
+            "embedding_cache": self.embedding_cache.stats() if self.embedding_cache else {},
+        }
+
+    async def close(self):
+        await self.batcher.close()
+        if self.embedding_cache:
+            self.embedding_cache.close()
+        if self.worker:
+            self.worker.close()
+        await self.client.close()
 
 
 vector_service = VectorService()
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# the app imports modules relative to api/ (e.g. ``from core.config import settings``)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings requires SECRET_KEY and reads .env from the working directory, so
+# without this the tests only collect when pytest runs inside api/
+os.environ.setdefault("SECRET_KEY", "test-secret")
@@ -0,0 +1,58 @@
+import json
+
+import pytest
+
+pytest.importorskip("pydantic_settings")
+
+from db.codec import FLAG_ZSTD, FORMAT_MSGPACK, FORMAT_ORJSON, RecordCodec  # noqa: E402
+
+RECORD = {
+    "id": "5f0c",
+    "deleted": False,
+    "title": "Заголовок",
+    "tags": ["a", "b"],
+    "metadata": {"nested": {"n": 1}},
+}
+
+
+def test_orjson_round_trip():
+    codec = RecordCodec("orjson")
+    value = codec.encode(RECORD)
+    assert value[0] == FORMAT_ORJSON
+    assert codec.decode(value) == RECORD
+
+
+def test_msgpack_round_trip():
+    pytest.importorskip("msgpack")
+    codec = RecordCodec("msgpack")
+    value = codec.encode(RECORD)
+    assert value[0] == FORMAT_MSGPACK
+    assert codec.decode(value) == RECORD
+
+
+def test_compression_starts_at_the_threshold():
+    pytest.importorskip("zstandard")
+    codec = RecordCodec("orjson", compression_threshold=64)
+    small = codec.encode({"id": "x"})
+    large = codec.encode({**RECORD, "content": "x" * 1000})
+    assert not small[0] & FLAG_ZSTD
+    assert large[0] == FORMAT_ORJSON | FLAG_ZSTD
+    assert codec.decode(large)["content"] == "x" * 1000
+
+
+@pytest.mark.parametrize("legacy", [RECORD, ["a", "b"]], ids=["object", "list"])
+def test_legacy_json_values_still_decode(legacy):
+    # values written with json.dumps before the codec existed
+    value = json.dumps(legacy).encode()
+    assert RecordCodec("orjson").decode(value) == legacy
+
+
+def test_any_codec_reads_the_other_format():
+    pytest.importorskip("msgpack")
+    written = RecordCodec("msgpack").encode(RECORD)
+    assert RecordCodec("orjson").decode(written) == RECORD
+
+
+def test_unknown_format_is_rejected():
+    with pytest.raises(ValueError):
+        RecordCodec("pickle")
@@ -0,0 +1,58 @@
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sentence_transformers")
+
+from benchmark_embeddings import encode, load_corpus, top_k  # noqa: E402
+from core.config import settings  # noqa: E402
+from services.embedders import load_embedder  # noqa: E402
+
+CORPUS = os.path.join(os.path.dirname(__file__), "fixtures", "corpus.ndjson")
+K = 5
+
+# int8 weights move vectors a little; the ranking must still hold
+THRESHOLDS = {
+    "onnx": {"min_cosine": 0.99, "min_recall": 0.95},
+    "onnx-int8": {"min_cosine": 0.95, "min_recall": 0.8},
+}
+
+
+def _load(backend):
+    try:
+        return load_embedder(settings.vector_model_name, backend, settings.embedding_onnx_file_name)
+    except ImportError as e:
+        pytest.skip(f"{backend} backend not installed: {e}")
+    except Exception as e:
+        # no network or model cache in this environment
+        pytest.skip(f"{settings.vector_model_name} unavailable for {backend}: {e}")
+
+
+@pytest.fixture(scope="module")
+def corpus():
+    docs = load_corpus(CORPUS)
+    return [f"{doc['title']}\n{doc['content']}" for doc in docs], [doc["title"] for doc in docs]
+
+
+@pytest.fixture(scope="module")
+def reference(corpus):
+    texts, queries = corpus
+    model = _load("torch")
+    return encode(model, texts, 32), encode(model, queries, 32)
+
+
+@pytest.mark.parametrize("backend", sorted(THRESHOLDS))
+def test_backend_matches_torch(backend, corpus, reference):
+    texts, queries = corpus
+    model = _load(backend)
+    doc_vectors, query_vectors = encode(model, texts, 32), encode(model, queries, 32)
+    reference_docs, reference_queries = reference
+
+    cosines = np.sum(reference_docs * doc_vectors, axis=1)
+    assert cosines.min() >= THRESHOLDS[backend]["min_cosine"]
+
+    expected = top_k(reference_queries, reference_docs, K)
+    actual = top_k(query_vectors, doc_vectors, K)
+    recall = np.mean([len(set(e) & set(a)) / K for e, a in zip(expected, actual)])
+    assert recall >= THRESHOLDS[backend]["min_recall"]
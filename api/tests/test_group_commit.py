@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("immudb")
+pytest.importorskip("pydantic_settings")
+
+from db.immudb_client import GroupCommitter  # noqa: E402
+
+
+class FakeImmudb:
+    """Records every setAll; a commit can be held open or made to fail."""
+
+    def __init__(self):
+        self.commits: list[dict[bytes, bytes]] = []
+        self.gates: dict[int, asyncio.Event] = {}
+        self.failures: set[int] = set()
+
+    async def set_all(self, kv):
+        number = len(self.commits)
+        self.commits.append(dict(kv))
+        if number in self.gates:
+            await self.gates[number].wait()
+        if number in self.failures:
+            raise ConnectionError(f"commit {number} failed")
+        return number
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_concurrent_writes_share_one_transaction():
+    async def scenario():
+        client = FakeImmudb()
+        committer = GroupCommitter(client, window_ms=5, max_keys=100)
+        headers = await asyncio.gather(
+            committer.set_all({b"a": b"1"}),
+            committer.set_all({b"b": b"2", b"c": b"3"}),
+            committer.set(b"d", b"4"),
+        )
+        return client, headers
+
+    client, headers = run(scenario())
+    assert client.commits == [{b"a": b"1", b"b": b"2", b"c": b"3", b"d": b"4"}]
+    assert headers == [0, 0, 0]
+
+
+def test_duplicate_key_cuts_the_batch():
+    async def scenario():
+        client = FakeImmudb()
+        committer = GroupCommitter(client, window_ms=5, max_keys=100)
+        await asyncio.gather(
+            committer.set_all({b"a": b"old", b"b": b"1"}),
+            committer.set_all({b"a": b"new"}),
+        )
+        return client
+
+    client = run(scenario())
+    # immudb rejects a key twice in one setAll, and the later write must win
+    assert client.commits == [{b"a": b"old", b"b": b"1"}, {b"a": b"new"}]
+
+
+def test_max_keys_flushes_without_waiting_for_the_window():
+    async def scenario():
+        client = FakeImmudb()
+        # a window this long would time the test out if it were waited for
+        committer = GroupCommitter(client, window_ms=60_000, max_keys=2)
+        await asyncio.wait_for(committer.set_all({b"a": b"1", b"b": b"2"}), 1)
+        return client
+
+    assert run(scenario()).commits == [{b"a": b"1", b"b": b"2"}]
+
+
+def test_batches_commit_in_submission_order():
+    async def scenario():
+        client = FakeImmudb()
+        client.gates[0] = asyncio.Event()
+        committer = GroupCommitter(client, window_ms=1, max_keys=1)
+        first = asyncio.create_task(committer.set(b"a", b"1"))
+        second = asyncio.create_task(committer.set(b"b", b"2"))
+        await asyncio.sleep(0.01)
+        # the second batch is ready but must wait for the first one
+        assert client.commits == [{b"a": b"1"}]
+        assert not second.done()
+        client.gates[0].set()
+        return client, await first, await second
+
+    client, first, second = run(scenario())
+    assert client.commits == [{b"a": b"1"}, {b"b": b"2"}]
+    assert (first, second) == (0, 1)
+
+
+def test_a_failed_batch_only_fails_its_own_writers():
+    async def scenario():
+        client = FakeImmudb()
+        client.failures.add(0)
+        committer = GroupCommitter(client, window_ms=1, max_keys=1)
+        return await asyncio.gather(
+            committer.set(b"a", b"1"),
+            committer.set(b"b", b"2"),
+            return_exceptions=True,
+        )
+
+    failed, committed = run(scenario())
+    assert isinstance(failed, ConnectionError)
+    assert committed == 1
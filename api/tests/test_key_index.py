@@ -0,0 +1,156 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("immudb")
+pytest.importorskip("pydantic_settings")
+
+import crud.index as index  # noqa: E402
+from crud.index import MARKER, KeyIndex, TimeIndex, decode_cursor  # noqa: E402
+
+
+class FakeImmudb:
+    """In-memory key space with immudb's scan contract.
+
+    Whether the seek key itself is returned differs between server versions,
+    so the paging code has to work either way.
+    """
+
+    def __init__(self, inclusive_seek: bool):
+        self.inclusive_seek = inclusive_seek
+        self.data: dict[bytes, bytes] = {}
+
+    async def get(self, key):
+        return SimpleNamespace(value=self.data[key]) if key in self.data else None
+
+    async def set(self, key, value):
+        self.data[key] = value
+
+    async def set_all(self, kv):
+        self.data.update(kv)
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+    async def delete_all(self, keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan(self, seek_key, prefix, desc, limit):
+        keys = sorted((key for key in self.data if key.startswith(prefix)), reverse=desc)
+        if seek_key:
+            keys = [
+                key
+                for key in keys
+                if (key < seek_key if desc else key > seek_key)
+                or (self.inclusive_seek and key == seek_key)
+            ]
+        return {key: self.data[key] for key in keys[:limit]}
+
+
+@pytest.fixture(params=[False, True], ids=["exclusive-seek", "inclusive-seek"])
+def db(request, monkeypatch):
+    fake = FakeImmudb(inclusive_seek=request.param)
+    monkeypatch.setattr(index, "immudb", fake)
+    return fake
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_page_walks_every_id_once(db):
+    ids = [f"doc-{n:02d}" for n in range(7)]
+    keys = KeyIndex(b"documents:index")
+    for item_id in reversed(ids):
+        run(keys.add(item_id))
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = run(keys.cursor_page(cursor, 3))
+        seen.extend(page)
+        if cursor is None:
+            break
+    assert seen == ids
+
+
+def test_page_after_a_removed_id_continues_behind_it(db):
+    keys = KeyIndex(b"documents:index")
+    for item_id in ("a", "b", "c"):
+        run(keys.add(item_id))
+    run(keys.remove("b"))
+    assert run(keys.page("b", 10)) == ["c"]
+
+
+def test_last_full_page_still_returns_a_cursor(db):
+    keys = KeyIndex(b"documents:index")
+    for item_id in ("a", "b"):
+        run(keys.add(item_id))
+    page, cursor = run(keys.cursor_page(None, 2))
+    assert page == ["a", "b"]
+    assert decode_cursor(cursor) == "b"
+    assert run(keys.cursor_page(cursor, 2)) == ([], None)
+
+
+def test_invalid_cursor_is_rejected():
+    with pytest.raises(ValueError):
+        decode_cursor("not base64!")
+
+
+def test_iter_ids_crosses_scan_pages(db, monkeypatch):
+    monkeypatch.setattr(index, "SCAN_PAGE_SIZE", 2)
+    keys = KeyIndex(b"news:index")
+    for item_id in ("a", "b", "c", "d", "e"):
+        run(keys.add(item_id))
+    assert run(keys.all()) == ["a", "b", "c", "d", "e"]
+
+
+def test_migrate_moves_markers_out_of_the_record_namespace(db, monkeypatch):
+    monkeypatch.setattr(index, "SCAN_PAGE_SIZE", 2)
+    db.data.update({
+        b"user:index:alice": MARKER,
+        b"user:index:bob": MARKER,
+        b"user:index:carol": MARKER,
+        # a record whose id happens to start with "index:"
+        b"user:index:mallory": b'{"username": "index:mallory"}',
+    })
+    keys = KeyIndex(b"user:index")
+
+    assert run(keys.migrate()) == 3
+    assert run(keys.all()) == ["alice", "bob", "carol"]
+    assert db.data[b"user:index:mallory"] == b'{"username": "index:mallory"}'
+    assert not any(key.startswith(b"user:index:") and key != b"user:index:mallory" for key in db.data)
+    # a second run finds nothing left to do
+    assert run(keys.migrate()) == 0
+
+
+def test_migrate_converts_the_legacy_json_list(db):
+    db.data[b"documents:index"] = json.dumps(["b", "a", "b"]).encode()
+    keys = KeyIndex(b"documents:index")
+
+    assert run(keys.migrate()) == 2
+    assert run(keys.all()) == ["a", "b"]
+    assert b"documents:index" not in db.data
+
+
+def test_migrate_leaves_an_unreadable_legacy_list_alone(db):
+    db.data[b"documents:index"] = b"not json"
+    assert run(KeyIndex(b"documents:index").migrate()) == 0
+    assert db.data[b"documents:index"] == b"not json"
+
+
+def test_time_index_returns_newest_first(db):
+    timeline = TimeIndex(b"documents:latest")
+    for created_at, item_id in (
+        ("2024-01-02T00:00:00Z", "second"),
+        # isoformat() drops a zero fraction; keys must still sort by time
+        ("2024-01-02T00:00:00.500000Z", "third"),
+        ("2024-01-01T12:00:00Z", "first"),
+    ):
+        run(db.set(timeline.entry_key(created_at, item_id), item_id.encode()))
+
+    assert run(timeline.latest(2)) == ["third", "second"]
+    run(timeline.remove("2024-01-02T00:00:00.500000Z", "third"))
+    assert run(timeline.latest(5)) == ["second", "first"]